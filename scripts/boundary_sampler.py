@@ -0,0 +1,341 @@
+"""
+Adaptive Verfeinerung entlang von Status-Grenzen der Testmatrix.
+
+Startet mit einem groben Gitter ueber die numerischen Achsen (area, people, roofArea) je
+Kombination der kategorialen Eingaben und teilt nur Zellen weiter, deren Eckpunkte sich in
+Status/Meldungen (oder beobachteten Kennzahlen) unterscheiden. Die Zellen einer Stufe und
+ihre neuen Eckpunkte werden blockweise (CELL_CHUNK bzw. EVAL_CHUNK) im vektorisierten
+Rechenkern ausgewertet, der Speicherbedarf haengt also nicht von der Stufengroesse ab.
+Ergebnis sind die Eckpunkte der feinsten gemischten Zellen, also die Grenzpunkte.
+
+Aufruf:
+    python scripts/boundary_sampler.py --fix houseType=reihenhaus --area 60 250 --roof 10 100 --output grenzen.csv
+    python scripts/boundary_sampler.py --watch pv_kwp=0.5 --max-depth 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import itertools
+import math
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from modernisierung_batch import (
+    ISSUE_MESSAGES,
+    OUTPUT_COLUMNS,
+    STATUS_LABELS,
+    WARNING_MESSAGES,
+    engine_params,
+    evaluate,
+    flags_to_messages,
+)
+from modernisierung_core import INPUT_AXES, SCENARIOS, load_data
+
+NUMERIC_AXES: Tuple[str, ...] = ("area", "people", "roofArea")
+INTEGER_AXES = {"people"}
+CATEGORICAL_AXES: List[Tuple[str, List]] = [(name, values) for name, values in INPUT_AXES if name not in NUMERIC_AXES]
+EVAL_CHUNK = 100_000  # Punkte je Aufruf des Rechenkerns
+CELL_CHUNK = 400_000  # Zellen je Block einer Verfeinerungsstufe
+
+Interval = Tuple[float, float]
+
+
+class BoundarySampler:
+    """Zellen liegen auf einem ganzzahligen Gitter der feinsten Aufloesung.
+
+    Eckpunkte werden als int64-Schluessel (Kontext, Gitterindex je Achse) kodiert; dadurch laufen
+    Eckenbildung, Cache-Abgleich und Teilung vollstaendig als Array-Operationen. Ergebnisse werden
+    in Auswertungsreihenfolge an wachsende Spalten angehaengt; `keys`/`_pos` bilden den sortierten
+    Index Schluessel -> Ablageposition.
+    """
+
+    def __init__(self, data: Dict, contexts: List[Dict], ranges: Dict[str, Interval], grid: int = 5,
+                 max_depth: int = 6, watch: Optional[Dict[str, float]] = None) -> None:
+        self.params = engine_params(data)
+        self.contexts = contexts
+        self.grid = max(2, grid)
+        self.max_depth = max_depth
+        self.watch = watch or {}
+        self.origin = np.array([float(ranges[name][0]) for name in NUMERIC_AXES])
+        spans = np.array([float(ranges[name][1] - ranges[name][0]) for name in NUMERIC_AXES])
+        fine = (self.grid - 1) * 2 ** max_depth
+        self.integer = np.array([name in INTEGER_AXES for name in NUMERIC_AXES])
+        # Ganzzahlige Achsen: Gitterabstand 1, sonst Spannweite / feinste Teilung
+        self.step = np.where(self.integer, 1.0, spans / fine)
+        self.size = np.where(self.integer, spans + 1, fine + 1).astype(np.int64)
+        self.keys = np.empty(0, dtype=np.int64)
+        self._pos = np.empty(0, dtype=np.int64)
+        self._count = 0
+        # Spalten mit Reserve (Faktor 1,5 beim Wachsen); "sig" = Signatur (Status, Meldungen,
+        # beobachtete Kennzahlen aller Szenarien) als kompakte Id je Punkt, "boundary" = Grenzpunkt
+        self._columns: Dict[str, np.ndarray] = {}
+        self._sig_index: Dict[Tuple, int] = {}
+
+    @property
+    def evaluations(self) -> int:
+        return self._count
+
+    @property
+    def sig_ids(self) -> np.ndarray:
+        return self._columns["sig"][:self._count]
+
+    @property
+    def results(self) -> Dict[str, np.ndarray]:
+        return {name: arr[:self._count] for name, arr in self._columns.items() if name not in ("sig", "boundary")}
+
+    def _encode(self, ctx: np.ndarray, idx: np.ndarray) -> np.ndarray:
+        key = ctx.astype(np.int64)
+        for j in range(len(NUMERIC_AXES)):
+            key = key * self.size[j] + idx[..., j]
+        return key
+
+    def _decode(self, keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        idx = np.empty((len(keys), len(NUMERIC_AXES)), dtype=np.int64)
+        rest = keys.copy()
+        for j in reversed(range(len(NUMERIC_AXES))):
+            rest, idx[:, j] = np.divmod(rest, self.size[j])
+        return rest, idx
+
+    def coords(self, idx: np.ndarray) -> np.ndarray:
+        return self.origin + idx * self.step
+
+    def _initial_cells(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        per_axis = []
+        for j in range(len(NUMERIC_AXES)):
+            edges = np.unique(np.round(np.linspace(0, self.size[j] - 1, self.grid)).astype(np.int64))
+            if len(edges) == 1:
+                edges = np.repeat(edges, 2)
+            per_axis.append((edges[:-1], edges[1:]))
+        grids = np.meshgrid(*(np.arange(len(lo)) for lo, _ in per_axis), indexing="ij")
+        pos = [g.reshape(-1) for g in grids]
+        lo = np.column_stack([per_axis[j][0][pos[j]] for j in range(len(NUMERIC_AXES))])
+        hi = np.column_stack([per_axis[j][1][pos[j]] for j in range(len(NUMERIC_AXES))])
+        n_ctx = len(self.contexts)
+        ctx = np.repeat(np.arange(n_ctx), len(lo))
+        return ctx, np.tile(lo, (n_ctx, 1)), np.tile(hi, (n_ctx, 1))
+
+    def corner_keys(self, ctx: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+        """Schluessel der 2^d Eckpunkte je Zelle, Form (Zellen, 2^d)."""
+        bits = np.array(list(itertools.product((0, 1), repeat=len(NUMERIC_AXES))), dtype=bool)
+        corners = np.where(bits[None, :, :], hi[:, None, :], lo[:, None, :])
+        return self._encode(ctx[:, None], corners)
+
+    def _append(self, columns: Dict[str, np.ndarray]) -> None:
+        n = len(columns["sig"])
+        for name, values in columns.items():
+            arr = self._columns.get(name)
+            if arr is None or len(arr) < self._count + n:
+                capacity = max(EVAL_CHUNK, self._count + n, 0 if arr is None else len(arr) * 3 // 2)
+                grown = np.empty((capacity, *values.shape[1:]), dtype=values.dtype)
+                if arr is not None:
+                    grown[:self._count] = arr[:self._count]
+                self._columns[name] = arr = grown
+            arr[self._count:self._count + n] = values
+        self._count += n
+
+    def _evaluate_chunk(self, keys: np.ndarray) -> None:
+        ctx, idx = self._decode(keys)
+        inputs = {name: np.array([self.contexts[c][name] for c in ctx.tolist()]) for name, _ in CATEGORICAL_AXES}
+        values = self.coords(idx)
+        for j, name in enumerate(NUMERIC_AXES):
+            inputs[name] = values[:, j]
+        res = evaluate(self.params, inputs)
+        parts = [res["status"], res["issue_flags"], res["warning_flags"]]
+        for name, tol in self.watch.items():
+            parts.append(np.floor(np.nan_to_num(res[name], nan=-1e12) / tol))
+        sigs = np.concatenate([np.asarray(part, dtype=np.int64) for part in parts], axis=-1)
+        rows, inverse = np.unique(sigs, axis=0, return_inverse=True)
+        row_ids = np.array([self._sig_index.setdefault(tuple(row), len(self._sig_index)) for row in rows.tolist()])
+        columns = {"sig": row_ids[inverse.reshape(-1)].astype(np.int32), "boundary": np.zeros(len(keys), dtype=bool)}
+        columns.update({name: res[name] for name in ("status", "issue_flags", "warning_flags", *self.watch)})
+        self._append(columns)
+
+    def _evaluate(self, keys: np.ndarray) -> None:
+        missing = np.setdiff1d(np.unique(keys), self.keys, assume_unique=True)
+        if not len(missing):
+            return
+        first = self._count
+        for lo in range(0, len(missing), EVAL_CHUNK):
+            self._evaluate_chunk(missing[lo:lo + EVAL_CHUNK])
+        # missing ist sortiert und wurde in dieser Reihenfolge abgelegt
+        at = np.searchsorted(self.keys, missing)
+        self.keys = np.insert(self.keys, at, missing)
+        self._pos = np.insert(self._pos, at, np.arange(first, self._count))
+
+    def _lookup(self, keys: np.ndarray) -> np.ndarray:
+        """Ablageposition je (bereits ausgewertetem) Schluessel."""
+        return self._pos[np.searchsorted(self.keys, keys)]
+
+    def _cell_blocks(self, parents: Optional[Tuple[np.ndarray, ...]]) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Zellen einer Stufe blockweise: Startgitter bzw. Kinder aus je CELL_CHUNK / 2^d Elternzellen."""
+        if parents is None:
+            ctx, lo, hi = self._initial_cells()
+            for start in range(0, len(ctx), CELL_CHUNK):
+                yield ctx[start:start + CELL_CHUNK], lo[start:start + CELL_CHUNK], hi[start:start + CELL_CHUNK]
+            return
+        per_block = max(1, CELL_CHUNK >> len(NUMERIC_AXES))
+        for start in range(0, len(parents[0]), per_block):
+            yield self._split(*(arr[start:start + per_block] for arr in parents))
+
+    def run(self) -> int:
+        """Verfeinert gemischte Zellen bis max_depth und markiert die Eckpunkte der feinsten gemischten
+        Zellen als Grenzpunkte (boundary_keys). Liefert die Anzahl dieser Grenzzellen."""
+        parents: Optional[Tuple[np.ndarray, ...]] = None
+        boundary_cells = 0
+        for depth in range(self.max_depth + 1):
+            kept = []
+            for ctx, lo, hi in self._cell_blocks(parents):
+                keys = self.corner_keys(ctx, lo, hi)
+                self._evaluate(keys.reshape(-1))
+                pos = self._lookup(keys)
+                sigs = self.sig_ids[pos]
+                mixed = np.any(sigs != sigs[:, :1], axis=1)
+                ctx, lo, hi, pos = ctx[mixed], lo[mixed], hi[mixed], pos[mixed]
+
+                splittable = (hi - lo) > 1
+                final = ~splittable.any(axis=1) | (depth == self.max_depth)
+                self._columns["boundary"][pos[final].reshape(-1)] = True
+                boundary_cells += int(final.sum())
+                # Nur die zu teilenden Elternzellen bleiben bis zur naechsten Stufe im Speicher
+                kept.append((ctx[~final], lo[~final], hi[~final], splittable[~final]))
+            parents = tuple(np.concatenate([k[i] for k in kept]) for i in range(4))
+            if not len(parents[0]):
+                break
+        return boundary_cells
+
+    def boundary_keys(self) -> np.ndarray:
+        """Sortierte Schluessel aller Grenzpunkte."""
+        return self.keys[self._columns["boundary"][self._pos]]
+
+    def _split(self, ctx: np.ndarray, lo: np.ndarray, hi: np.ndarray,
+               splittable: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        mid = (lo + hi) // 2
+        children = []
+        for bits in itertools.product((False, True), repeat=len(NUMERIC_AXES)):
+            upper = np.array(bits)[None, :]
+            # Nicht teilbare Achsen nur einmal (untere Haelfte = ganze Zelle) uebernehmen
+            keep = ~np.any(upper & ~splittable, axis=1)
+            c_lo = np.where(upper & splittable, mid, lo)
+            c_hi = np.where(~upper & splittable, mid, hi)
+            children.append((ctx[keep], c_lo[keep], c_hi[keep]))
+        return tuple(np.concatenate([c[i] for c in children]) for i in range(3))
+
+    def dense_equivalent(self) -> int:
+        """Auswertungen, die ein gleichmaessiges Gitter in der feinsten Aufloesung braeuchte."""
+        return int(np.prod(self.size)) * len(self.contexts)
+
+
+def _messages(flags: np.ndarray, messages: List[str]) -> np.ndarray:
+    codes, inverse = np.unique(flags, return_inverse=True)
+    texts = np.asarray(["; ".join(flags_to_messages(code, messages)) for code in codes], dtype=object)
+    return texts[inverse.reshape(-1)]
+
+
+def _boundary_rows(sampler: BoundarySampler, keys: np.ndarray) -> List[np.ndarray]:
+    ctx, idx = sampler._decode(keys)
+    values = sampler.coords(idx)
+    n_scen = len(SCENARIOS)
+    # Eine CSV-Zeile je Grenzpunkt und Szenario, spaltenweise aufgebaut
+    rows = np.repeat(sampler._lookup(keys), n_scen)
+    scen = np.tile(np.arange(n_scen), len(keys))
+    row_ctx = np.repeat(ctx, n_scen)
+    results = {name: arr[rows, scen] for name, arr in sampler.results.items()}
+    columns = [np.asarray([c[name] for c in sampler.contexts], dtype=object)[row_ctx] for name, _ in CATEGORICAL_AXES]
+    for j, name in enumerate(NUMERIC_AXES):
+        col = np.repeat(values[:, j], n_scen)
+        columns.append(col.astype(np.int64) if name in INTEGER_AXES else np.round(col, 3))
+    columns += [
+        np.asarray([label for label, _, _ in SCENARIOS], dtype=object)[scen],
+        np.asarray(STATUS_LABELS, dtype=object)[results["status"]],
+        _messages(results["issue_flags"], ISSUE_MESSAGES),
+        _messages(results["warning_flags"], WARNING_MESSAGES),
+        *(results[name] for name in sampler.watch),
+    ]
+    return columns
+
+
+def write_boundary(path: Path, sampler: BoundarySampler, chunk_size: int = 100_000) -> int:
+    keys = sampler.boundary_keys()
+    with Path(path).open("w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow([*(name for name, _ in CATEGORICAL_AXES), *NUMERIC_AXES, "scenario", "status",
+                         "issues", "warnings", *sampler.watch])
+        for lo in range(0, len(keys), chunk_size):
+            columns = _boundary_rows(sampler, keys[lo:lo + chunk_size])
+            writer.writerows(zip(*(col.tolist() for col in columns)))
+    return len(keys)
+
+
+def _parse_fix(raw: List[str]) -> Dict[str, List]:
+    fixed: Dict[str, List] = {}
+    axes = dict(CATEGORICAL_AXES)
+    for item in raw:
+        name, _, value = item.partition("=")
+        if name not in axes:
+            raise SystemExit(f"--fix erwartet eine kategoriale Achse ({', '.join(axes)}), nicht {name!r}")
+        matches = [v for v in axes[name] if str(v).lower() == value.lower()]
+        if not matches:
+            raise SystemExit(f"Wert {value!r} nicht auf Achse {name} ({axes[name]})")
+        fixed.setdefault(name, []).extend(matches)
+    return fixed
+
+
+def _parse_watch(raw: List[str]) -> Dict[str, float]:
+    watch: Dict[str, float] = {}
+    for item in raw:
+        name, _, tol = item.partition("=")
+        if name not in OUTPUT_COLUMNS:
+            raise SystemExit(f"--watch erwartet eine Kennzahl ({', '.join(OUTPUT_COLUMNS)}), nicht {name!r}")
+        try:
+            value = float(tol) if tol else 1.0
+        except ValueError:
+            raise SystemExit(f"Toleranz {tol!r} fuer {name} ist keine Zahl") from None
+        if not (math.isfinite(value) and value > 0):
+            raise SystemExit(f"Toleranz fuer {name} muss groesser als 0 sein, nicht {tol!r}")
+        watch[name] = value
+    return watch
+
+
+def main() -> None:
+    axes = dict(INPUT_AXES)
+    parser = argparse.ArgumentParser(description="Grenzpunkte von Status-Regionen adaptiv bestimmen")
+    parser.add_argument("--area", nargs=2, type=float, default=[min(axes["area"]), max(axes["area"])], metavar=("MIN", "MAX"))
+    parser.add_argument("--people", nargs=2, type=int, default=[min(axes["people"]), max(axes["people"])], metavar=("MIN", "MAX"))
+    parser.add_argument("--roof", nargs=2, type=float, default=[min(axes["roofArea"]), max(axes["roofArea"])], metavar=("MIN", "MAX"))
+    parser.add_argument("--grid", type=int, default=5, help="Punkte je Achse im Startgitter")
+    parser.add_argument("--max-depth", type=int, default=6, help="Maximale Verfeinerungsstufen")
+    parser.add_argument("--fix", nargs="*", default=[], metavar="ACHSE=WERT",
+                        help="Kategoriale Achsen einschraenken, z.B. houseType=reihenhaus wallbox=false")
+    parser.add_argument("--watch", nargs="*", default=[], metavar="SPALTE=TOL",
+                        help="Zusaetzlich Aenderungen einer Kennzahl um mehr als TOL als Grenze werten")
+    parser.add_argument("--output", type=Path, default=Path("boundary_points.csv"))
+    args = parser.parse_args()
+
+    fixed = _parse_fix(args.fix)
+    names = [name for name, _ in CATEGORICAL_AXES]
+    contexts = [dict(zip(names, combo)) for combo in itertools.product(*(fixed.get(n, v) for n, v in CATEGORICAL_AXES))]
+    watch = _parse_watch(args.watch)
+
+    sampler = BoundarySampler(
+        load_data(),
+        contexts,
+        {"area": tuple(args.area), "people": tuple(args.people), "roofArea": tuple(args.roof)},
+        grid=args.grid,
+        max_depth=args.max_depth,
+        watch=watch,
+    )
+    n_cells = sampler.run()
+    n_points = write_boundary(args.output, sampler)
+    dense = sampler.dense_equivalent()
+    print(f"Kontexte: {len(contexts)}, Grenzzellen: {n_cells}, Grenzpunkte: {n_points}")
+    print(f"Auswertungen: {sampler.evaluations} (dichtes Gitter gleicher Aufloesung: {dense}, "
+          f"{sampler.evaluations / dense:.1%})")
+    print(f"Geschrieben: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Lasttest gegen einen lokal laufenden calc_service.
+
+Mehrere Keep-Alive-Verbindungen senden Batches zufaelliger Haushalte (aus den Achsen der
+Testmatrix, damit sich Cache-Treffer einstellen) und messen die Latenz je Anfrage.
+
+Aufruf:
+    python scripts/calc_service.py --port 8080 &
+    python scripts/calc_loadtest.py --url http://127.0.0.1:8080 --connections 32 --duration 10 --batch 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Dict, List, Tuple
+from urllib.parse import urlsplit
+
+from fetch_telemetry import percentile
+from modernisierung_core import INPUT_AXES
+
+
+def random_household(rng: random.Random, unique: bool) -> Dict:
+    inp = {name: rng.choice(values) for name, values in INPUT_AXES}
+    if unique:
+        # Kontinuierliche Werte -> praktisch keine Cache-Treffer
+        inp["area"] = round(rng.uniform(60, 300), 1)
+        inp["roofArea"] = round(rng.uniform(10, 120), 1)
+    return inp
+
+
+async def _request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, host: str, method: str,
+                   path: str, payload: Dict = None) -> Tuple[int, Dict]:
+    body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def _worker(host: str, port: int, deadline: float, batch: int, unique: bool, seed: int,
+                  latencies: List[float], errors: List[int]) -> None:
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            payload = {"households": [random_household(rng, unique) for _ in range(batch)]}
+            t0 = time.perf_counter()
+            status, _ = await _request(reader, writer, host, "POST", "/calculate", payload)
+            latencies.append(time.perf_counter() - t0)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def run(url: str, connections: int, duration: float, batch: int, unique: bool) -> None:
+    parts = urlsplit(url)
+    host, port = parts.hostname or "127.0.0.1", parts.port or 80
+    latencies: List[float] = []
+    errors: List[int] = []
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(
+        _worker(host, port, deadline, batch, unique, seed, latencies, errors) for seed in range(connections)
+    ))
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await asyncio.open_connection(host, port)
+    _, metrics = await _request(reader, writer, host, "GET", "/metrics")
+    writer.close()
+
+    lat = sorted(latencies)
+    print(f"Anfragen: {len(lat)} in {elapsed:.1f} s ({connections} Verbindungen, {batch} Haushalte/Anfrage)")
+    print(f"Durchsatz: {len(lat) / elapsed:.1f} req/s, {len(lat) * batch / elapsed:.0f} Haushalte/s")
+    print(f"Latenz: p50 {percentile(lat, 50) * 1000:.2f} ms, p99 {percentile(lat, 99) * 1000:.2f} ms, "
+          f"max {lat[-1] * 1000 if lat else 0:.2f} ms")
+    print(f"Fehler: {len(errors)}")
+    cache = metrics.get("cache", {})
+    print(f"Cache: Trefferquote {cache.get('hit_rate', 0):.1%} ({cache.get('size')}/{cache.get('capacity')} Eintraege)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Lasttest fuer calc_service (req/s, p99-Latenz)")
+    parser.add_argument("--url", default="http://127.0.0.1:8080")
+    parser.add_argument("--connections", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="Sekunden")
+    parser.add_argument("--batch", type=int, default=10, help="Haushalte je Anfrage")
+    parser.add_argument("--unique", action="store_true", help="Zufaellige Flaechen statt Matrixwerte (Cache-Misses)")
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.connections, args.duration, args.batch, args.unique))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+"""
+Lokaler Batch-Rechendienst fuer Partner-Portale auf Basis von modernisierung_core.
+
+Endpunkte (JSON, HTTP/1.1 mit Keep-Alive, asyncio - langsame Clients blockieren andere nicht):
+    POST /calculate   {"households": [{"houseType": "reihenhaus", "area": 120, ...}, ...]}
+    GET  /metrics     Cache-Trefferquote, Anfragen, Fehler
+    GET  /health
+
+Ergebnisse werden in einem begrenzten LRU-Cache ueber die normalisierten Eingaben gehalten.
+Batches (max. MAX_BATCH Haushalte) rechnen in einem eigenen Thread, /health und /metrics
+antworten also auch waehrend grosser Batches; Batches selbst laufen nacheinander.
+
+Aufruf:
+    python scripts/calc_service.py --port 8080 --cache-size 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+from modernisierung_core import INPUT_AXES, data_hash, load_data, result_status, scenario_calculations
+
+MAX_BODY_BYTES = 2 * 1024 * 1024
+MAX_LINE_BYTES = 64 * 1024  # Anfragezeile bzw. einzelne Header-Zeile
+MAX_BATCH = 1000
+# Grobe Plausibilitaetsgrenzen; verhindern u.a. OverflowError bei Werten wie 1e308
+NUMBER_BOUNDS = {"area": (0, 10_000), "people": (1, 100), "roofArea": (0, 10_000)}
+REQUIRED_FIELDS = ("houseType", "area", "people", "insulation", "roofArea")
+BOOL_FIELDS = ("floorHeating", "climate", "wallbox")
+HOUSE_TYPES = dict(INPUT_AXES)["houseType"]
+INSULATIONS = dict(INPUT_AXES)["insulation"]
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    431: "Request Header Fields Too Large",
+    500: "Internal Server Error",
+}
+
+
+class LRUCache:
+    """Begrenzter LRU-Cache mit Trefferstatistik."""
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self._items: "OrderedDict[Tuple, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Tuple) -> Optional[Any]:
+        try:
+            value = self._items[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Tuple, value: Any) -> None:
+        if self.capacity <= 0:
+            return
+        self._items[key] = value
+        self._items.move_to_end(key)
+        if len(self._items) > self.capacity:
+            self._items.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._items),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def _to_bool(value: Any, name: str) -> bool:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str) and value.strip().lower() in ("true", "false", "1", "0", "ja", "nein"):
+        return value.strip().lower() in ("true", "1", "ja")
+    raise ValueError(f"{name} muss boolesch sein")
+
+
+def _to_number(value: Any, name: str) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError(f"{name} muss eine Zahl sein")
+    try:
+        number = float(value)
+    except ValueError:
+        raise ValueError(f"{name} muss eine Zahl sein") from None
+    minimum, maximum = NUMBER_BOUNDS[name]
+    if not minimum <= number <= maximum:
+        raise ValueError(f"{name} muss zwischen {minimum} und {maximum} liegen")
+    # 120 und 120.0 landen im selben Cache-Eintrag
+    return int(number) if number.is_integer() else number
+
+
+def normalize_household(raw: Any) -> Dict[str, Any]:
+    if not isinstance(raw, dict):
+        raise ValueError("Haushalt muss ein JSON-Objekt sein")
+    missing = [name for name in REQUIRED_FIELDS if name not in raw]
+    if missing:
+        raise ValueError(f"Fehlende Felder: {', '.join(missing)}")
+    house_type = str(raw["houseType"]).strip().lower()
+    if house_type not in HOUSE_TYPES:
+        raise ValueError(f"houseType muss einer von {', '.join(HOUSE_TYPES)} sein")
+    insulation = str(raw["insulation"]).strip().lower()
+    if insulation not in INSULATIONS:
+        raise ValueError(f"insulation muss einer von {', '.join(INSULATIONS)} sein")
+    people = _to_number(raw["people"], "people")
+    if not isinstance(people, int):
+        raise ValueError("people muss ganzzahlig sein")
+    inp = {
+        "houseType": house_type,
+        "area": _to_number(raw["area"], "area"),
+        "people": people,
+        "insulation": insulation,
+        "roofArea": _to_number(raw["roofArea"], "roofArea"),
+    }
+    for name in BOOL_FIELDS:
+        inp[name] = _to_bool(raw.get(name, False), name)
+    return {name: inp[name] for name, _ in INPUT_AXES}
+
+
+class CalculationService:
+    def __init__(self, data: Dict, cache_size: int) -> None:
+        self.data = data
+        self.data_hash = data_hash(data)
+        self.cache = LRUCache(cache_size)
+        self.started = time.time()
+        self.requests = 0
+        self.households = 0
+        self.errors = 0
+        # Ein Rechen-Thread: der Event-Loop bleibt fuer andere Verbindungen frei, Cache und Zaehler
+        # werden trotzdem nur von einem Thread veraendert
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="calc")
+
+    def calculate(self, raw: Any) -> Dict[str, Any]:
+        try:
+            inp = normalize_household(raw)
+        except ValueError as exc:
+            self.errors += 1
+            return {"error": str(exc)}
+        key = tuple(inp[name] for name, _ in INPUT_AXES)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        try:
+            results = scenario_calculations(self.data, inp)
+        except ArithmeticError as exc:
+            self.errors += 1
+            return {"inputs": inp, "error": f"Berechnung fehlgeschlagen: {exc}"}
+        scenarios = [
+            {
+                "scenario": res.scenario,
+                "status": result_status(res),
+                "outputs": res.outputs,
+                "issues": res.issues,
+                "warnings": res.warnings,
+            }
+            for res in results
+        ]
+        result = {"inputs": inp, "scenarios": scenarios}
+        self.cache.put(key, result)
+        return result
+
+    def calculate_batch(self, payload: Any) -> Tuple[int, Dict[str, Any]]:
+        households = payload.get("households") if isinstance(payload, dict) else None
+        if not isinstance(households, list):
+            return 400, {"error": "Erwartet {\"households\": [...]}"}
+        if len(households) > MAX_BATCH:
+            return 413, {"error": f"Maximal {MAX_BATCH} Haushalte je Anfrage"}
+        self.households += len(households)
+        return 200, {"data_hash": self.data_hash, "results": [self.calculate(h) for h in households]}
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "uptime_s": round(time.time() - self.started, 1),
+            "requests": self.requests,
+            "households": self.households,
+            "invalid_households": self.errors,
+            "cache": self.cache.stats(),
+            "data_hash": self.data_hash,
+        }
+
+    async def route(self, method: str, path: str, body: bytes) -> Tuple[int, Dict[str, Any]]:
+        self.requests += 1
+        try:
+            return await self._route(method, path, body)
+        except Exception as exc:  # noqa: BLE001
+            # Verbindung nie ohne Antwort schliessen
+            print(f"[WARN] {method} {path}: {type(exc).__name__}: {exc}")
+            return 500, {"error": "Interner Fehler"}
+
+    async def _route(self, method: str, path: str, body: bytes) -> Tuple[int, Dict[str, Any]]:
+        if path == "/calculate":
+            if method != "POST":
+                return 405, {"error": "POST erwartet"}
+            try:
+                payload = json.loads(body or b"null")
+            except ValueError:
+                return 400, {"error": "Ungueltiges JSON"}
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, self.calculate_batch, payload)
+        if path == "/metrics" and method == "GET":
+            return 200, self.metrics()
+        if path == "/health" and method == "GET":
+            return 200, {"status": "ok"}
+        return 404, {"error": f"Unbekannter Pfad {path}"}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                # readline() meldet Zeilen ueber dem Stream-Limit als ValueError; danach ist der
+                # Puffer nicht mehr synchron, die Verbindung wird nach der Antwort geschlossen
+                try:
+                    request_line = await reader.readline()
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "Anfragezeile zu lang"}, keep_alive=False)
+                    break
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "Ungueltige Anfragezeile"}, keep_alive=False)
+                    break
+                headers = {}
+                try:
+                    while True:
+                        line = await reader.readline()
+                        if line in (b"\r\n", b"\n", b""):
+                            break
+                        name, _, value = line.decode("latin-1").partition(":")
+                        headers[name.strip().lower()] = value.strip()
+                except ValueError:
+                    await self._respond(writer, 431, {"error": "Header-Zeile zu lang"}, keep_alive=False)
+                    break
+                try:
+                    length = int(headers.get("content-length", "0"))
+                except ValueError:
+                    length = -1
+                if not 0 <= length <= MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {"error": "Anfrage zu gross"}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                status, payload = await self.route(method.upper(), target.split("?", 1)[0], body)
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: int, payload: Dict[str, Any], keep_alive: bool) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+
+async def serve(host: str, port: int, cache_size: int) -> None:
+    service = CalculationService(load_data(), cache_size)
+    server = await asyncio.start_server(service.handle, host, port, limit=MAX_LINE_BYTES)
+    print(f"[INFO] Rechendienst auf http://{host}:{port} (Cache {cache_size} Eintraege, data.json {service.data_hash[:12]})")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.executor.shutdown(wait=False)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Lokaler Batch-Rechendienst (JSON) mit LRU-Cache")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--cache-size", type=int, default=50_000, help="Max. Anzahl gecachter Haushalte")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.cache_size))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+Monats- und Tageskurven der Diagramme fuer die ganze Testmatrix (NumPy).
+
+Spiegelt simulateYear, simulateDay (Sommer/Winter) und generateScenarioCurves aus
+scripts/script.js. Je Matrixzeile und Szenario entstehen die Reihen pv, load,
+selfConsumption, gridImport, feedIn als Arrays (Zeilen, Szenarien, Reihen, 12 bzw. 24).
+Die Kurvensaetze werden als .npy-Dateien neben den Ergebnisspalten eines matrix_store
+abgelegt (curves_<satz>.npy) und im Manifest unter "curves" beschrieben.
+
+Aufruf:
+    python scripts/chart_curves.py build out/matrix
+    python scripts/chart_curves.py show out/matrix houseType=reihenhaus area=150 people=3 ...
+    python scripts/chart_curves.py qa out/matrix
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from matrix_checkpoint import write_manifest
+from matrix_store import DEFAULT_CHUNK_SIZE, MatrixStore, parse_assignment
+from modernisierung_batch import decode_inputs, evaluate_range
+from modernisierung_core import SCENARIOS, data_hash, flat_index, load_data
+
+# Konstanten wie in script.js
+MONTHLY_PV_FACTORS = np.array([0.03, 0.05, 0.11, 0.13, 0.14, 0.13, 0.12, 0.11, 0.09, 0.06, 0.025, 0.015])
+DAILY_PV_SHAPE = np.array([
+    0, 0, 0, 0, 0.05, 0.15, 0.30, 0.55, 0.75, 0.95, 1.0, 1.0,
+    0.95, 0.85, 0.65, 0.45, 0.25, 0.12, 0.05, 0, 0, 0, 0, 0,
+])
+DAILY_HOUSEHOLD_SHAPE = np.array([
+    0.12, 0.10, 0.08, 0.07, 0.08, 0.20, 0.35, 0.25, 0.10, 0.08, 0.10, 0.12,
+    0.15, 0.20, 0.25, 0.30, 0.40, 0.45, 0.35, 0.25, 0.20, 0.18, 0.15, 0.12,
+])
+SEASONS: Dict[str, Tuple[float, float, float]] = {  # Sonnenaufgang, -untergang, PV-Spitzenfaktor
+    "summer": (5, 21, 1.0),
+    "winter": (8.5, 16, 0.3),
+}
+
+SERIES: Tuple[str, ...] = ("pv", "load", "selfConsumption", "gridImport", "feedIn")
+CURVE_SETS: Dict[str, int] = {  # Satz -> Laenge
+    "year": 12,  # simulateYear
+    "day_summer": 24,  # simulateDay, daySeason = 'summer'
+    "day_winter": 24,  # simulateDay, daySeason = 'winter'
+    "scenario_month": 12,  # generateScenarioCurves (Monat)
+    "scenario_day": 24,  # generateScenarioCurves (Tag)
+}
+
+MONTHS = np.arange(12)
+HOURS = np.arange(24)
+
+
+def _stack(pv, load, self_use, grid, feed_in) -> np.ndarray:
+    return np.stack(np.broadcast_arrays(pv, load, self_use, grid, feed_in), axis=-2)
+
+
+def _boost(storage_kwh) -> np.ndarray:
+    return np.where(np.asarray(storage_kwh)[..., None] > 0, 0.75, 0.35)
+
+
+def simulate_year(pv_kwp, household_kwh, hp_kwh, storage_kwh, include_hp, include_ac) -> np.ndarray:
+    """simulateYear fuer beliebige Array-Formen (...); Ergebnis (..., len(SERIES), 12)."""
+    pv = np.asarray(pv_kwp)[..., None] * 1000 * MONTHLY_PV_FACTORS
+    winter_factor = np.where(np.isin(MONTHS, [11, 0, 1]), 2.8, np.where((MONTHS < 3) | (MONTHS > 8), 1.2, 0.3))
+    consumption = np.asarray(household_kwh)[..., None] / 12 + np.zeros(12)
+    consumption = consumption + np.where(np.asarray(include_hp)[..., None],
+                                         np.asarray(hp_kwh)[..., None] / 12 * winter_factor, 0.0)
+    consumption = consumption + np.where(np.asarray(include_ac)[..., None] & (MONTHS >= 5) & (MONTHS <= 8), 40.0, 0.0)
+    self_use = np.minimum(consumption, pv * _boost(storage_kwh))
+    return _stack(pv, consumption, self_use, np.maximum(0, consumption - self_use), np.maximum(0, pv - self_use))
+
+
+def simulate_day(pv_kwp, household_kwh, hp_kwh, storage_kwh, include_hp, include_ac, season: str = "summer") -> np.ndarray:
+    """simulateDay; Ergebnis (..., len(SERIES), 24)."""
+    sunrise, sunset, peak = SEASONS[season]
+    midday = (sunrise + sunset) / 2
+    bell = np.maximum(0, 1 - (np.abs(HOURS - midday) / ((sunset - sunrise) / 2)) ** 2)
+    bell = np.where((HOURS < sunrise) | (HOURS > sunset), 0.0, bell)
+    pv = bell * np.asarray(pv_kwp)[..., None] * 0.22 * peak
+
+    hourly = np.asarray(household_kwh)[..., None] / 365 / 24
+    profile = np.where((HOURS >= 6) & (HOURS <= 9), 1.4, np.where((HOURS >= 17) & (HOURS <= 21), 1.7, 1.0))
+    hp_factor = np.where(((HOURS >= 5) & (HOURS <= 9)) | ((HOURS >= 17) & (HOURS <= 23)), 1.6, 1.0)
+    consumption = hourly * profile
+    consumption = consumption + np.where(np.asarray(include_hp)[..., None],
+                                         np.asarray(hp_kwh)[..., None] / 365 / 24 * hp_factor, 0.0)
+    consumption = consumption + np.where(np.asarray(include_ac)[..., None] & (HOURS >= 14) & (HOURS <= 18),
+                                         0.2 * hourly, 0.0)
+    self_use = np.minimum(consumption, pv * _boost(storage_kwh))
+    return _stack(pv, consumption, self_use, consumption - self_use, np.maximum(0, pv - self_use))
+
+
+def scenario_curves(pv_kwp, household_kwh, hp_kwh, storage_kwh, include_hp, include_ac) -> Tuple[np.ndarray, np.ndarray]:
+    """generateScenarioCurves (Monat, Tag); feedIn = max(0, pv - selfConsumption) ergaenzt."""
+    pv_kwp = np.asarray(pv_kwp)[..., None]
+    household = np.asarray(household_kwh)[..., None]
+    hp = np.asarray(hp_kwh)[..., None]
+    include_hp = np.asarray(include_hp)[..., None]
+    include_ac = np.asarray(include_ac)[..., None]
+    boost = _boost(storage_kwh)
+
+    pv_month = pv_kwp * 1000 * MONTHLY_PV_FACTORS * 1.05
+    heat_month = np.where(np.isin((MONTHS + 1) % 12, [10, 11, 0, 1]), hp * 0.7 / 4, hp * 0.3 / 8)
+    load_month = household / 12 + np.where(include_hp, heat_month, 0.0)
+    load_month = load_month + np.where(include_ac & (MONTHS >= 5) & (MONTHS <= 8), 60.0, 0.0)
+    self_month = np.minimum(load_month, pv_month * boost)
+    month = _stack(pv_month, load_month, self_month, np.maximum(0, load_month - self_month),
+                   np.maximum(0, pv_month - self_month))
+
+    pv_day = DAILY_PV_SHAPE * pv_kwp * 1000 / 365 * 1.05
+    base_daily = household / 365
+    load_day = base_daily * DAILY_HOUSEHOLD_SHAPE
+    hp_factor = np.where(((HOURS >= 5) & (HOURS <= 9)) | ((HOURS >= 17) & (HOURS <= 23)), 1.6, 1.0)
+    load_day = load_day + np.where(include_hp, hp / 365 * hp_factor, 0.0)
+    load_day = load_day + np.where(include_ac & (HOURS >= 14) & (HOURS <= 18), 0.2 * base_daily, 0.0)
+    self_day = np.minimum(load_day, pv_day * boost)
+    day = _stack(pv_day, load_day, self_day, np.maximum(0, load_day - self_day), np.maximum(0, pv_day - self_day))
+    return month, day
+
+
+def curve_inputs(result: Dict[str, np.ndarray], inputs: Dict[str, np.ndarray]) -> Tuple[np.ndarray, ...]:
+    """Argumente wie in updateChartsForScenario: householdElectric = Jahresverbrauch inkl. WP-Block."""
+    household = (result["household_block"] + result["climate_block"] + result["ev_block"]
+                 + result["heatpump_block"])
+    include_hp = np.array([use_hp for _, _, use_hp in SCENARIOS])
+    include_ac = np.broadcast_to(inputs["climate"][:, None], household.shape)
+    return result["pv_kwp"], household, result["heatpump_block"], result["battery_kwh"], include_hp, include_ac
+
+
+def compute_curves(result: Dict[str, np.ndarray], inputs: Dict[str, np.ndarray],
+                   sets: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+    """Kurvensaetze je Zeile und Szenario, Form (n, Szenarien, len(SERIES), Laenge)."""
+    args = curve_inputs(result, inputs)
+    sets = sets or list(CURVE_SETS)
+    curves: Dict[str, np.ndarray] = {}
+    if "year" in sets:
+        curves["year"] = simulate_year(*args)
+    for season in SEASONS:
+        if f"day_{season}" in sets:
+            curves[f"day_{season}"] = simulate_day(*args, season=season)
+    if "scenario_month" in sets or "scenario_day" in sets:
+        month, day = scenario_curves(*args)
+        curves.update({name: values for name, values in (("scenario_month", month), ("scenario_day", day))
+                       if name in sets})
+    return curves
+
+
+def build_curves(path: Path, data: Dict, sets: Optional[List[str]] = None, dtype: str = "float32",
+                 chunk_size: int = DEFAULT_CHUNK_SIZE) -> MatrixStore:
+    """Berechnet die Kurven fuer den Bereich eines Stores und legt sie als curves_<satz>.npy daneben ab."""
+    store = MatrixStore(path, mode="r+")
+    if data_hash(data) != store.manifest["data_hash"]:
+        raise ValueError("data.json passt nicht zum Store-Manifest")
+    sets = sets or list(CURVE_SETS)
+    arrays = {
+        name: open_memmap(store.path / f"curves_{name}.npy", mode="w+", dtype=dtype,
+                          shape=(len(store), len(SCENARIOS), len(SERIES), CURVE_SETS[name]))
+        for name in sets
+    }
+    for lo in range(store.start, store.stop, chunk_size):
+        hi = min(lo + chunk_size, store.stop)
+        curves = compute_curves(evaluate_range(data, lo, hi, store.axes), decode_inputs(lo, hi, store.axes), sets)
+        for name, values in curves.items():
+            arrays[name][lo - store.start:hi - store.start] = values
+    for arr in arrays.values():
+        arr.flush()
+    store.manifest["curves"] = {
+        **store.manifest.get("curves", {}),
+        **{name: {"length": CURVE_SETS[name], "series": list(SERIES), "dtype": dtype} for name in sets},
+    }
+    write_manifest(store.path, store.manifest)
+    return MatrixStore(store.path)
+
+
+def load_curves(store: MatrixStore, name: str) -> np.ndarray:
+    if name not in store.manifest.get("curves", {}):
+        raise KeyError(f"Kurvensatz {name!r} nicht im Store (chart_curves.py build)")
+    return np.load(store.path / f"curves_{name}.npy", mmap_mode="r")
+
+
+def qa_report(store: MatrixStore, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, Dict]:
+    """Bilanz-Invarianten und Form-Kennzahlen je Kurvensatz, blockweise ueber den Store."""
+    report = {}
+    labels = [label for label, _, _ in SCENARIOS]
+    for name in store.manifest.get("curves", {}):
+        curves = load_curves(store, name)
+        length = curves.shape[-1]
+        violations = {"self>pv": 0, "self>load": 0, "negative": 0, "balance": 0}
+        peak = np.zeros((len(SCENARIOS), length), dtype=np.int64)
+        shape_sum = np.zeros((len(SCENARIOS), len(SERIES), length))
+        for lo in range(0, len(store), chunk_size):
+            c = np.asarray(curves[lo:lo + chunk_size], dtype=float)
+            pv, load, self_use, grid, feed_in = (c[:, :, i] for i in range(len(SERIES)))
+            tol = 1e-3 * np.maximum(1.0, np.abs(c).max(axis=(2, 3), keepdims=True)[:, :, 0])
+            violations["self>pv"] += int((self_use > pv + tol).sum())
+            violations["self>load"] += int((self_use > load + tol).sum())
+            violations["negative"] += int((c < -tol[..., None]).sum())
+            violations["balance"] += int((np.abs(load - self_use - grid) > tol).sum()
+                                         + (np.abs(np.maximum(0, pv - self_use) - feed_in) > tol).sum())
+            has_pv = pv.max(axis=-1) > 0
+            for s in range(len(SCENARIOS)):
+                peak[s] += np.bincount(pv[has_pv[:, s], s].argmax(axis=-1), minlength=length)
+            total = c.sum(axis=-1, keepdims=True)
+            shape_sum += np.divide(c, total, out=np.zeros_like(c), where=total > 0).sum(axis=0)
+        report[name] = {
+            "violations": violations,
+            "pv_peak": {labels[s]: int(peak[s].argmax()) for s in range(len(SCENARIOS))},
+            "mean_shape": {labels[s]: {SERIES[i]: np.round(shape_sum[s, i] / max(1, len(store)), 4).tolist()
+                                       for i in range(len(SERIES))} for s in range(len(SCENARIOS))},
+        }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Diagramm-Kurven (Monat/Tag) fuer die Testmatrix")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_build = sub.add_parser("build", help="Kurven fuer einen Store berechnen und ablegen")
+    p_build.add_argument("store", type=Path)
+    p_build.add_argument("--sets", nargs="+", choices=list(CURVE_SETS), help="Nur diese Kurvensaetze")
+    p_build.add_argument("--dtype", choices=["float32", "float16"], default="float32")
+    p_build.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    p_show = sub.add_parser("show", help="Kurven einer Eingabe ausgeben (Abgleich mit dem Frontend)")
+    p_show.add_argument("store", type=Path)
+    p_show.add_argument("inputs", nargs="+", help="achse=wert, z.B. houseType=reihenhaus area=150")
+    p_show.add_argument("--set", default="year", choices=list(CURVE_SETS))
+    p_qa = sub.add_parser("qa", help="Bilanz-Invarianten und mittlere Kurvenformen pruefen")
+    p_qa.add_argument("store", type=Path)
+    p_qa.add_argument("--json", action="store_true", help="Bericht als JSON ausgeben")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        store = build_curves(args.store, load_data(), args.sets, args.dtype, args.chunk_size)
+        print(f"Kurven geschrieben: {', '.join(store.manifest['curves'])} ({len(store)} Eingaben x {len(SCENARIOS)} Szenarien)")
+        return
+
+    store = MatrixStore(args.store)
+    if args.command == "show":
+        inp = dict(parse_assignment(raw, store.axes) for raw in args.inputs)
+        missing = [name for name, _ in store.axes if name not in inp]
+        if missing:
+            raise SystemExit(f"Fehlende Achsen: {', '.join(missing)}")
+        row = store.row_of(inp)
+        curves = load_curves(store, args.set)[row]
+        print(f"Index {flat_index(inp, store.axes)}, Kurvensatz {args.set}")
+        for s, (label, _, _) in enumerate(SCENARIOS):
+            print(f"\n=== {label} ===")
+            for i, series in enumerate(SERIES):
+                print(f"  {series:16s} " + " ".join(f"{v:8.2f}" for v in curves[s, i].tolist()))
+        return
+
+    report = qa_report(store)
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+        return
+    for name, r in report.items():
+        broken = {k: v for k, v in r["violations"].items() if v}
+        state = "ok" if not broken else ", ".join(f"{k} {v}" for k, v in broken.items())
+        peaks = ", ".join(f"{label}: {idx}" for label, idx in r["pv_peak"].items())
+        print(f"{name:15s} Invarianten: {state} | haeufigstes PV-Maximum (Index) {peaks}")
+
+
+if __name__ == "__main__":
+    main()
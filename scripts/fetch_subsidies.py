@@ -5,34 +5,20 @@ Requires OPENAI_API_KEY to be set. Updates data/subsidies.json in-place.
 
 from __future__ import annotations
 
+import argparse
 import json
-import os
 from datetime import date
 from pathlib import Path
-from typing import Any, Dict, List
-
-from dotenv import load_dotenv
-import openai
-from openai import OpenAI
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
 from prompts import SUBSIDY_SYSTEM_PROMPT
-from fetch_subsidy_prices import update_price_data
-
-ROOT = Path(__file__).resolve().parent.parent
-SUBSIDY_PATH = ROOT / "data" / "subsidies.json"
+from fetch_subsidy_prices import MODEL, ensure_client, update_price_data
+from fetch_telemetry import DEFAULT_RETRIES, TELEMETRY_DIR, Telemetry
+from subsidy_catalog import BUNDESLAENDER, MEASURES, SUBSIDY_PATH
 
-BUNDESLAENDER = [
-    "BW", "BY", "BE", "BB", "HB", "HH", "HE", "MV",
-    "NI", "NW", "RP", "SL", "SN", "ST", "SH", "TH",
-]
+if TYPE_CHECKING:
+    from openai import OpenAI
 
-MEASURES = [
-    "pv",
-    "battery",
-    "heatpump",
-    "heating_optimization",
-    "building_envelope",
-]
 
 def load_existing() -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
     if SUBSIDY_PATH.exists():
@@ -60,24 +46,24 @@ def validate_entries(raw: Any) -> List[Dict[str, Any]]:
     return valid
 
 
-def parse_response(text: str, bundesland: str, measure: str) -> List[Dict[str, Any]]:
+def parse_response(text: str, bundesland: str, measure: str) -> Tuple[Any, str]:
+    """Liefert (geparstes JSON, Parse-Pfad direct/fallback/failed)."""
     try:
-        parsed = json.loads(text)
-        return validate_entries(parsed)
+        return json.loads(text), "direct"
     except Exception as exc:  # noqa: BLE001
         # Fallback: versuche den erstbesten JSON-Array-Block herauszuschneiden
         if "[" in text and "]" in text:
             try:
                 frag = text[text.index("[") : text.rindex("]") + 1]
-                parsed = json.loads(frag)
-                return validate_entries(parsed)
+                return json.loads(frag), "fallback"
             except Exception:
                 pass
         print(f"[WARN] Parsing-Fehler bei {bundesland}/{measure}: {exc}. Antwort (gekuerzt): {text[:200]!r}")
-        return []
+        return [], "failed"
 
 
-def fetch_for(client: OpenAI, bundesland: str, measure: str) -> List[Dict[str, Any]]:
+def fetch_for(client: OpenAI, bundesland: str, measure: str,
+              telemetry: Optional[Telemetry] = None) -> List[Dict[str, Any]]:
     today = date.today().isoformat()
     user_prompt = (
         f"Gib mir aktuelle Foerderprogramme in Deutschland fuer das Bundesland {bundesland} "
@@ -88,86 +74,81 @@ def fetch_for(client: OpenAI, bundesland: str, measure: str) -> List[Dict[str, A
         "Erstelle KEINE Links oder Deep-Links. "
         "Wenn du keine sicheren Programme kennst, antworte mit []."
     )
+    telemetry = telemetry or Telemetry("fetch_subsidies")
+    record = telemetry.start("subsidies", f"{bundesland}/{measure}", MODEL)
     try:
-        response = client.responses.create(
-            model="gpt-4.1-mini",
+        response = telemetry.send(record, lambda: client.responses.create(
+            model=MODEL,
             input=[
                 {"role": "system", "content": SUBSIDY_SYSTEM_PROMPT},
                 {"role": "user", "content": user_prompt},
             ],
-        )
+        ))
         # Der Responses-API liefert Text im ersten output-Element
         text = response.output_text  # type: ignore[attr-defined]
-        return parse_response(text, bundesland, measure)
+        parsed, record.parse_path = parse_response(text, bundesland, measure)
+        entries = validate_entries(parsed)
+        record.entries_raw = len(parsed) if isinstance(parsed, list) else 0
+        record.entries = len(entries)
+        return entries
     except Exception as exc:  # noqa: BLE001
         print(f"[WARN] Fehler bei {bundesland}/{measure}: {exc}")
         return []
+    finally:
+        telemetry.finish(record)
 
 
 def main() -> None:
-    # Load .env if present so OPENAI_API_KEY is available
-    load_dotenv()
-
-    # Basic version check to avoid legacy 0.x installs
-    version = getattr(openai, "__version__", "0.0.0")
-    try:
-        major = int(version.split(".")[0])
-    except Exception:  # noqa: BLE001
-        major = 0
-    if major < 1:
-        raise SystemExit(
-            f"Inkompatible openai-Version ({version}). Bitte `pip install --upgrade openai httpx` ausfuehren."
-        )
-
-    api_key = os.environ.get("OPENAI_API_KEY")
-    if not api_key:
-        raise SystemExit("OPENAI_API_KEY not set")
-
-    try:
-        client = OpenAI(api_key=api_key)
-    except TypeError as exc:
-        raise SystemExit(
-            "Fehler beim Initialisieren des OpenAI-Clients (moeglicherweise alte httpx/openai-Version). "
-            "Bitte `pip install --upgrade openai httpx` und erneut versuchen."
-        ) from exc
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES, help="Wiederholungen je fehlgeschlagener Anfrage")
+    parser.add_argument("--telemetry-dir", type=Path, default=TELEMETRY_DIR,
+                        help="Ziel fuer fetch_requests.jsonl, Zusammenfassung und Prometheus-Textfile")
+    args = parser.parse_args()
+
+    # Laedt .env, prueft die openai-Version und OPENAI_API_KEY
+    client = ensure_client()
+    telemetry = Telemetry("fetch_subsidies", args.telemetry_dir, retries=args.retries)
     data = load_existing()
 
-    for state in BUNDESLAENDER:
-        print(f"[INFO] Aktualisiere {state} ...")
-        if state not in data:
-            data[state] = {m: [] for m in MEASURES}
-        for measure in MEASURES:
-            entries = fetch_for(client, state, measure)
-            cleaned_entries: List[Dict[str, Any]] = []
-            for entry in entries:
-                entry_type = (entry.get("type") or "").strip()
-                type_lower = entry_type.lower()
-                if type_lower == "bund":
-                    link_portal = "https://www.energiewechsel.de"
-                elif type_lower == "land":
-                    link_portal = "https://www.foerderdatenbank.de"
-                else:
-                    link_portal = "https://www.co2online.de/foerdermittel/foerdermittel-check/"
-
-                cleaned_entries.append(
-                    {
-                        "title": entry.get("title", ""),
-                        "type": entry_type,
-                        "description": entry.get("description", ""),
-                        "link_portal": link_portal,
-                    }
-                )
-
-            data[state][measure] = cleaned_entries
-            status = f"{len(entries)} Eintraege" if entries else "keine Eintraege"
-            print(f"  - {measure}: {status}")
-
-    SUBSIDY_PATH.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
-    print(f"[DONE] subsidies.json aktualisiert: {SUBSIDY_PATH}")
-
-    price_changed = update_price_data(client)
-    if price_changed:
-        print("[DONE] data.json (Preisannahmen) aktualisiert.")
+    try:
+        for state in BUNDESLAENDER:
+            print(f"[INFO] Aktualisiere {state} ...")
+            if state not in data:
+                data[state] = {m: [] for m in MEASURES}
+            for measure in MEASURES:
+                entries = fetch_for(client, state, measure, telemetry)
+                cleaned_entries: List[Dict[str, Any]] = []
+                for entry in entries:
+                    entry_type = (entry.get("type") or "").strip()
+                    type_lower = entry_type.lower()
+                    if type_lower == "bund":
+                        link_portal = "https://www.energiewechsel.de"
+                    elif type_lower == "land":
+                        link_portal = "https://www.foerderdatenbank.de"
+                    else:
+                        link_portal = "https://www.co2online.de/foerdermittel/foerdermittel-check/"
+
+                    cleaned_entries.append(
+                        {
+                            "title": entry.get("title", ""),
+                            "type": entry_type,
+                            "description": entry.get("description", ""),
+                            "link_portal": link_portal,
+                        }
+                    )
+
+                data[state][measure] = cleaned_entries
+                status = f"{len(entries)} Eintraege" if entries else "keine Eintraege"
+                print(f"  - {measure}: {status}")
+
+        SUBSIDY_PATH.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"[DONE] subsidies.json aktualisiert: {SUBSIDY_PATH}")
+
+        price_changed = update_price_data(client, telemetry)
+        if price_changed:
+            print("[DONE] data.json (Preisannahmen) aktualisiert.")
+    finally:
+        telemetry.write()
 
 
 if __name__ == "__main__":
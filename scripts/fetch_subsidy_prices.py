@@ -4,19 +4,21 @@ Fetch market price assumptions and update data.json when deviations exceed toler
 
 from __future__ import annotations
 
+import argparse
 import json
 import os
 from pathlib import Path
-from typing import Any, Dict, Iterable, Tuple
-
-from dotenv import load_dotenv
-import openai
-from openai import OpenAI
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional, Tuple
 
 from prompts import PRICE_SYSTEM_PROMPT
+from fetch_telemetry import DEFAULT_RETRIES, TELEMETRY_DIR, Telemetry
+
+if TYPE_CHECKING:
+    from openai import OpenAI
 
 ROOT = Path(__file__).resolve().parent.parent
 DATA_PATH = ROOT / "data" / "data.json"
+MODEL = "gpt-4.1-mini"
 
 FIELD_MAP: Dict[str, Tuple[str, ...]] = {
     "electricity": ("prices", "electricity_eur_per_kwh"),
@@ -31,6 +33,11 @@ FIELD_MAP: Dict[str, Tuple[str, ...]] = {
 
 
 def ensure_client(existing: OpenAI | None = None) -> OpenAI:
+    # openai/dotenv erst hier laden, damit Import und --help ohne API-Abhaengigkeiten laufen
+    from dotenv import load_dotenv
+    import openai
+    from openai import OpenAI
+
     load_dotenv()
 
     version = getattr(openai, "__version__", "0.0.0")
@@ -59,31 +66,43 @@ def ensure_client(existing: OpenAI | None = None) -> OpenAI:
         ) from exc
 
 
-def parse_prices_response(text: str) -> Dict[str, Any]:
+def parse_prices_response(text: str) -> Tuple[Dict[str, Any], str]:
+    """Liefert (geparstes JSON, Parse-Pfad direct/fallback/failed)."""
     try:
-        return json.loads(text)
+        return json.loads(text), "direct"
     except Exception:  # noqa: BLE001
         if "{" in text and "}" in text:
             try:
                 frag = text[text.index("{") : text.rindex("}") + 1]
-                return json.loads(frag)
+                return json.loads(frag), "fallback"
             except Exception:
                 pass
         print(f"[WARN] Konnte Antwort nicht parsen: {text[:200]!r}")
-        return {}
+        return {}, "failed"
 
 
-def fetch_market_prices(client: OpenAI) -> Dict[str, Any]:
+def fetch_market_prices(client: OpenAI, telemetry: Optional[Telemetry] = None) -> Dict[str, Any]:
     user_prompt = "Bitte liefere die Werte als kompaktes JSON mit klaren numerischen Feldern."
-    response = client.responses.create(
-        model="gpt-4.1-mini",
-        input=[
-            {"role": "system", "content": PRICE_SYSTEM_PROMPT},
-            {"role": "user", "content": user_prompt},
-        ],
-    )
-    text = response.output_text  # type: ignore[attr-defined]
-    return parse_prices_response(text)
+    telemetry = telemetry or Telemetry("fetch_subsidy_prices")
+    record = telemetry.start("prices", "market_prices", MODEL)
+    try:
+        response = telemetry.send(record, lambda: client.responses.create(
+            model=MODEL,
+            input=[
+                {"role": "system", "content": PRICE_SYSTEM_PROMPT},
+                {"role": "user", "content": user_prompt},
+            ],
+        ))
+        text = response.output_text  # type: ignore[attr-defined]
+        values, record.parse_path = parse_prices_response(text)
+        if not isinstance(values, dict):
+            values = {}
+        normalized = normalize_source_values(values)
+        record.entries_raw = len(values)
+        record.entries = sum(isinstance(normalized.get(key), (int, float)) for key in FIELD_MAP)
+        return values
+    finally:
+        telemetry.finish(record)
 
 
 def get_nested(data: Dict[str, Any], path: Iterable[str]) -> Any:
@@ -125,9 +144,9 @@ def normalize_source_values(raw: Dict[str, Any]) -> Dict[str, Any]:
     return normalized
 
 
-def update_price_data(client: OpenAI | None = None) -> bool:
+def update_price_data(client: OpenAI | None = None, telemetry: Optional[Telemetry] = None) -> bool:
     client = ensure_client(client)
-    market_values = fetch_market_prices(client)
+    market_values = fetch_market_prices(client, telemetry)
     if not market_values:
         print("[WARN] Keine neuen Marktwerte erhalten.")
         return False
@@ -155,5 +174,18 @@ def update_price_data(client: OpenAI | None = None) -> bool:
     return changed
 
 
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES, help="Wiederholungen je fehlgeschlagener Anfrage")
+    parser.add_argument("--telemetry-dir", type=Path, default=TELEMETRY_DIR,
+                        help="Ziel fuer fetch_requests.jsonl, Zusammenfassung und Prometheus-Textfile")
+    args = parser.parse_args()
+    telemetry = Telemetry("fetch_subsidy_prices", args.telemetry_dir, retries=args.retries)
+    try:
+        update_price_data(telemetry=telemetry)
+    finally:
+        telemetry.write()
+
+
 if __name__ == "__main__":
-    update_price_data()
+    main()
@@ -0,0 +1,227 @@
+"""
+Telemetrie fuer die Abrufe in fetch_subsidies.py und fetch_subsidy_prices.py.
+
+Je API-Anfrage ein Datensatz (Latenz, Tokens aus response.usage, Wiederholungen, Parse-Pfad
+direct/fallback/failed, Anzahl validierter Eintraege). Ausgabe:
+    fetch_requests.jsonl   eine JSON-Zeile je Anfrage (wird fortgeschrieben, Feld run_id)
+    <lauf>_summary.json    Zusammenfassung des letzten Laufs
+    <lauf>.prom            Prometheus-Textfile (node_exporter textfile collector)
+
+Nur Standardbibliothek, damit der Import ohne openai funktioniert.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+TELEMETRY_DIR = ROOT / "data" / "tmp" / "telemetry"
+REQUESTS_FILE = "fetch_requests.jsonl"
+METRIC_PREFIX = "energyplanning_fetch"
+
+PARSE_PATHS = ("direct", "fallback", "failed")
+NO_RESPONSE = "error"  # Anfrage auch nach allen Wiederholungen fehlgeschlagen
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF = 2.0
+
+
+@dataclass
+class RequestRecord:
+    run_id: str
+    job: str
+    key: str
+    model: str
+    started: str
+    latency_s: float = 0.0  # Dauer des erfolgreichen (bzw. letzten) Versuchs
+    total_s: float = 0.0  # inkl. Wiederholungen und Wartezeit
+    attempts: int = 0
+    retries: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    total_tokens: int = 0
+    parse_path: str = NO_RESPONSE
+    entries_raw: int = 0
+    entries: int = 0
+    error: str = ""
+
+
+def usage_of(response: Any) -> Dict[str, int]:
+    """Token-Verbrauch aus response.usage (Responses- und Chat-API-Feldnamen)."""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+    if isinstance(usage, dict):
+        get = usage.get
+    else:
+        def get(name: str, default: Any = None) -> Any:
+            return getattr(usage, name, default)
+    inp = get("input_tokens") or get("prompt_tokens") or 0
+    out = get("output_tokens") or get("completion_tokens") or 0
+    total = get("total_tokens") or inp + out
+    return {"input_tokens": int(inp), "output_tokens": int(out), "total_tokens": int(total)}
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # Nearest-Rank-Verfahren
+    idx = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[idx]
+
+
+class Telemetry:
+    """Sammelt RequestRecords eines Laufs; ohne Verzeichnis nur im Speicher."""
+
+    def __init__(self, run: str, directory: Optional[Path] = None, retries: int = DEFAULT_RETRIES,
+                 backoff: float = DEFAULT_BACKOFF) -> None:
+        self.run = run
+        self.directory = Path(directory) if directory else None
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.started = time.time()
+        self.run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        self.records: List[RequestRecord] = []
+        if self.directory:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def start(self, job: str, key: str, model: str) -> RequestRecord:
+        record = RequestRecord(
+            run_id=self.run_id,
+            job=job,
+            key=key,
+            model=model,
+            started=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        )
+        self.records.append(record)
+        return record
+
+    def send(self, record: RequestRecord, create: Callable[[], Any]) -> Any:
+        """Fuehrt `create` mit Wiederholungen (exponentielles Backoff) aus; wirft den letzten Fehler."""
+        first = time.perf_counter()
+        for attempt in range(self.retries + 1):
+            record.attempts = attempt + 1
+            record.retries = attempt
+            t0 = time.perf_counter()
+            try:
+                response = create()
+            except Exception as exc:  # noqa: BLE001
+                record.latency_s = time.perf_counter() - t0
+                record.total_s = time.perf_counter() - first
+                record.error = f"{type(exc).__name__}: {exc}"[:500]
+                if attempt == self.retries:
+                    raise
+                time.sleep(self.backoff * 2 ** attempt)
+                continue
+            record.latency_s = time.perf_counter() - t0
+            record.total_s = time.perf_counter() - first
+            record.error = ""
+            for name, value in usage_of(response).items():
+                setattr(record, name, value)
+            return response
+        raise RuntimeError("unreachable")
+
+    def finish(self, record: RequestRecord) -> None:
+        record.latency_s = round(record.latency_s, 4)
+        record.total_s = round(record.total_s, 4)
+        if self.directory:
+            with (self.directory / REQUESTS_FILE).open("a", encoding="utf-8") as f:
+                f.write(json.dumps(asdict(record), ensure_ascii=False) + "\n")
+
+    def summary(self) -> Dict[str, Any]:
+        jobs: Dict[str, Dict[str, Any]] = {}
+        for job in dict.fromkeys(r.job for r in self.records):
+            records = [r for r in self.records if r.job == job]
+            latencies = sorted(r.latency_s for r in records if r.parse_path != NO_RESPONSE)
+            jobs[job] = {
+                "requests": len(records),
+                "errors": sum(r.parse_path == NO_RESPONSE for r in records),
+                "retries": sum(r.retries for r in records),
+                "parse_paths": {p: sum(r.parse_path == p for r in records) for p in (*PARSE_PATHS, NO_RESPONSE)},
+                "entries_raw": sum(r.entries_raw for r in records),
+                "entries": sum(r.entries for r in records),
+                "input_tokens": sum(r.input_tokens for r in records),
+                "output_tokens": sum(r.output_tokens for r in records),
+                "total_tokens": sum(r.total_tokens for r in records),
+                "latency_s": {
+                    "p50": round(percentile(latencies, 50), 4),
+                    "p95": round(percentile(latencies, 95), 4),
+                    "max": round(latencies[-1], 4) if latencies else 0.0,
+                    "sum": round(sum(latencies), 4),
+                    "count": len(latencies),
+                },
+            }
+        return {
+            "run": self.run,
+            "run_id": self.run_id,
+            "started": datetime.fromtimestamp(self.started, timezone.utc).isoformat(timespec="seconds"),
+            "duration_s": round(time.time() - self.started, 2),
+            "jobs": jobs,
+        }
+
+    def write(self) -> Dict[str, Any]:
+        """Schreibt Zusammenfassung und Prometheus-Textfile und gibt eine Kurzfassung aus."""
+        summary = self.summary()
+        for job, s in summary["jobs"].items():
+            paths = ", ".join(f"{p} {n}" for p, n in s["parse_paths"].items() if n)
+            print(f"[INFO] Telemetrie {job}: {s['requests']} Anfragen ({paths}), {s['retries']} Wiederholungen, "
+                  f"{s['entries']}/{s['entries_raw']} Eintraege gueltig, {s['total_tokens']} Tokens, "
+                  f"Latenz p50 {s['latency_s']['p50']:.2f} s / p95 {s['latency_s']['p95']:.2f} s")
+        if self.directory:
+            _write_atomic(self.directory / f"{self.run}_summary.json",
+                          json.dumps(summary, indent=2, ensure_ascii=False) + "\n")
+            _write_atomic(self.directory / f"{self.run}.prom", prometheus_text(summary))
+            print(f"[INFO] Telemetrie geschrieben: {self.directory}")
+        return summary
+
+
+def _labels(**labels: str) -> str:
+    escaped = {k: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for k, v in labels.items()}
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped.items()) + "}"
+
+
+def prometheus_text(summary: Dict[str, Any]) -> str:
+    """Zusammenfassung im Prometheus-Textformat (Werte beziehen sich auf den letzten Lauf)."""
+    run = summary["run"]
+    p = METRIC_PREFIX
+    lines: List[str] = []
+
+    def metric(name: str, kind: str, help_text: str, samples: List[tuple]) -> None:
+        lines.append(f"# HELP {p}_{name} {help_text}")
+        lines.append(f"# TYPE {p}_{name} {kind}")
+        for suffix, labels, value in samples:
+            lines.append(f"{p}_{name}{suffix}{_labels(run=run, **labels)} {value}")
+
+    jobs = summary["jobs"].items()
+    metric("requests", "gauge", "API-Anfragen im letzten Lauf je Parse-Pfad",
+           [("", {"job": job, "parse_path": path}, n) for job, s in jobs for path, n in s["parse_paths"].items()])
+    metric("retries", "gauge", "Wiederholte Versuche im letzten Lauf",
+           [("", {"job": job}, s["retries"]) for job, s in jobs])
+    metric("entries_validated", "gauge", "Eintraege nach Validierung im letzten Lauf",
+           [("", {"job": job}, s["entries"]) for job, s in jobs])
+    metric("entries_raw", "gauge", "Eintraege in den geparsten Antworten vor Validierung",
+           [("", {"job": job}, s["entries_raw"]) for job, s in jobs])
+    metric("tokens", "gauge", "Token-Verbrauch im letzten Lauf",
+           [("", {"job": job, "kind": kind}, s[f"{kind}_tokens"]) for job, s in jobs for kind in ("input", "output")])
+    latency: List[tuple] = []
+    for job, s in jobs:
+        lat = s["latency_s"]
+        latency += [("", {"job": job, "quantile": q}, lat[k]) for q, k in (("0.5", "p50"), ("0.95", "p95"), ("1", "max"))]
+        latency += [("_sum", {"job": job}, lat["sum"]), ("_count", {"job": job}, lat["count"])]
+    metric("latency_seconds", "summary", "Latenz erfolgreicher API-Anfragen", latency)
+    metric("run_duration_seconds", "gauge", "Dauer des letzten Laufs", [("", {}, summary["duration_s"])])
+    metric("last_run_timestamp_seconds", "gauge", "Ende des letzten Laufs (Unix-Zeit)", [("", {}, int(time.time()))])
+    return "\n".join(lines) + "\n"
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    # Der textfile collector darf keine halb geschriebene Datei sehen
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
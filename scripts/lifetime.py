@@ -0,0 +1,217 @@
+"""
+Lebensdauer-Simulation der Testmatrix ueber 20–25 Jahre.
+
+Jahr 1 entspricht exakt dem vektorisierten Rechenkern. Fuer die Folgejahre sinkt der PV-Ertrag
+(Degradation), die nutzbare Speicherkapazitaet und der Speicher-Wirkungsgrad (Alterung), Strom-,
+Gas- und Kraftstoffpreise steigen mit den Inflationsraten aus data.json; die Einspeiseverguetung
+bleibt nominal fest. Die Jahre sind eine zusaetzliche Array-Achse: Dimensionierung je Zeile
+(n, 1) wird gegen Jahresfaktoren (Y,) gebroadcastet, die Energiebilanz laeuft einmal fuer (n, Y).
+
+Ergebnisse je Zeile und Szenario: Lebensdauer-Autarkie (Mittel der Jahres-Autarkie), kumulierter
+Netzbezug/Einspeisung, kumulierte Ersparnis und Break-even mit Degradation und Preissteigerung
+(interpoliert).
+
+Aufruf:
+    python scripts/lifetime.py --years 25
+    python scripts/lifetime.py --years 20 --pv-degradation 0.7 --battery-fade 3 --output lebensdauer.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from modernisierung_batch import (
+    consumption_blocks,
+    decode_inputs,
+    engine_params,
+    estimate_energy_balance,
+    recommend_battery_kwh,
+    recommend_pv_kwp,
+    round_like_core,
+)
+from modernisierung_core import (
+    COMBUSTION_FUEL_COST,
+    HEATPUMP_EXTRA,
+    INPUT_AXES,
+    SCENARIOS,
+    load_data,
+    matrix_size,
+)
+
+BATTERY_ROUNDTRIP = 0.83  # wie estimate_energy_balance im ersten Jahr
+
+# Jaehrliche Raten (Anteil pro Jahr); data.json kann sie unter "lifetime" ueberschreiben
+LIFETIME_DEFAULTS: Dict[str, float] = {
+    "years": 25,
+    "pv_degradation": 0.005,
+    "battery_fade": 0.02,
+    "battery_floor": 0.6,  # Restkapazitaet, unter die der Speicher nicht faellt
+    "roundtrip_fade": 0.003,
+}
+
+LIFETIME_COLUMNS: List[str] = [
+    "lifetime_autarky_pct",
+    "autarky_last_year_pct",
+    "cumulative_grid_import",
+    "cumulative_feed_in",
+    "cumulative_savings",
+    "break_even_years",
+    "break_even_lifetime_years",
+]
+
+
+def lifetime_settings(data: Dict, **overrides: Optional[float]) -> Dict[str, float]:
+    settings = {**LIFETIME_DEFAULTS, **data.get("lifetime", {})}
+    settings.update({k: v for k, v in overrides.items() if v is not None})
+    inflation = data.get("inflation", {})
+    settings.setdefault("electricity_inflation", inflation.get("electricity_rate", 0.0))
+    settings.setdefault("gas_inflation", inflation.get("gas_rate", 0.0))
+    settings.setdefault("fuel_inflation", data.get("price_inflation_rate", 0.0))
+    if not 1 <= int(settings["years"]) <= 50:
+        raise ValueError("years muss zwischen 1 und 50 liegen")
+    return settings
+
+
+def year_factors(settings: Dict[str, float]) -> Dict[str, np.ndarray]:
+    """Multiplikatoren je Jahr (Y,), Jahr 1 = 1."""
+    t = np.arange(int(settings["years"]), dtype=float)
+    return {
+        "pv": (1 - settings["pv_degradation"]) ** t,
+        "battery": np.maximum(settings["battery_floor"], (1 - settings["battery_fade"]) ** t),
+        "roundtrip": BATTERY_ROUNDTRIP * (1 - settings["roundtrip_fade"]) ** t,
+        "electricity": (1 + settings["electricity_inflation"]) ** t,
+        "gas": (1 + settings["gas_inflation"]) ** t,
+        "fuel": (1 + settings["fuel_inflation"]) ** t,
+    }
+
+
+def break_even(total_cost: np.ndarray, savings: np.ndarray) -> np.ndarray:
+    """Erstes Jahr, in dem die kumulierte Ersparnis die Investition deckt (linear interpoliert), sonst NaN."""
+    cum = np.cumsum(savings, axis=-1)
+    reached = cum >= total_cost[..., None]
+    first = np.argmax(reached, axis=-1)
+    prev = np.where(first > 0, np.take_along_axis(cum, np.maximum(first - 1, 0)[..., None], -1)[..., 0], 0.0)
+    step = np.take_along_axis(savings, first[..., None], -1)[..., 0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        years = first + (total_cost - prev) / step
+    return np.where(reached.any(axis=-1) & (total_cost > 0), years, np.nan)
+
+
+def simulate(params: Dict, inputs: Dict[str, np.ndarray], settings: Dict[str, float]) -> Dict[str, np.ndarray]:
+    """LIFETIME_COLUMNS je Zeile und Szenario, Form (n, len(SCENARIOS))."""
+    f = year_factors(settings)
+    blocks = consumption_blocks(params, inputs)
+    el_price = params["prices.electricity_eur_per_kwh"] * f["electricity"]
+    gas_price = params["prices.gas_eur_per_kwh"] * f["gas"]
+    feed_in_tariff = params["prices.feed_in_eur_per_kwh"]
+    pv_yield = params["pv.yield_per_kwp"]
+    wallbox = inputs["wallbox"][:, None]
+    col = {name: values[:, None] for name, values in blocks.items()}
+
+    baseline_cost = (col["household"] * el_price + col["heating"] * gas_price
+                     + np.where(wallbox, float(COMBUSTION_FUEL_COST), 0.0) * f["fuel"])
+    hp_cost = HEATPUMP_EXTRA / params["heatpump.full_load_hours"] * params["heatpump.cost_per_kw"]
+
+    per_scenario = []
+    for _, use_batt, use_hp in SCENARIOS:
+        hp_block = HEATPUMP_EXTRA if use_hp else 0
+        annual_consumption = blocks["household"] + blocks["climate"] + blocks["ev"] + hp_block
+        heating_demand = 0 if use_hp else col["heating"]
+
+        pv_kwp = recommend_pv_kwp(annual_consumption, inputs["roofArea"], inputs["houseType"])
+        if use_batt:
+            battery_kwh = recommend_battery_kwh(annual_consumption, pv_kwp, pv_yield)
+        else:
+            battery_kwh = np.zeros(np.shape(pv_kwp))
+        total_cost = (pv_kwp * params["pv.cost_per_kwp"] + battery_kwh * params["battery.cost_per_kwh"]
+                      + (hp_cost if use_hp else 0))
+
+        # (n, 1) gegen (Y,) -> (n, Y); Degradation wirkt auf den Ertrag, Alterung auf Kapazitaet und Wirkungsgrad
+        load = annual_consumption[:, None]
+        grid, feed_in, autarky_pct, _ = estimate_energy_balance(
+            pv_kwp[:, None], battery_kwh[:, None] * f["battery"], load, pv_yield * f["pv"],
+            wallbox, col["ev"], battery_roundtrip=f["roundtrip"],
+        )
+        post_cost = grid * el_price - feed_in * feed_in_tariff + heating_demand * gas_price
+        savings = baseline_cost - post_cost
+        with np.errstate(divide="ignore", invalid="ignore"):
+            static_be = np.where(savings[:, 0] > 0, total_cost / savings[:, 0], np.nan)
+            # Mittel der Jahres-Autarkie (Verbrauch ist je Zeile in allen Jahren gleich): gleiche
+            # Definition wie autarky_pct, bei --years 1 also exakt der Wert des Rechenkerns
+            lifetime_autarky = autarky_pct.mean(axis=-1)
+
+        per_scenario.append({
+            "lifetime_autarky_pct": round_like_core(lifetime_autarky, 1),
+            "autarky_last_year_pct": round_like_core(autarky_pct[:, -1], 1),
+            "cumulative_grid_import": round_like_core(grid.sum(axis=-1), 0),
+            "cumulative_feed_in": round_like_core(feed_in.sum(axis=-1), 0),
+            "cumulative_savings": round_like_core(savings.sum(axis=-1), 0),
+            "break_even_years": round_like_core(np.where(static_be == 0, np.nan, static_be), 1),
+            "break_even_lifetime_years": round_like_core(break_even(total_cost, savings), 1),
+        })
+    return {name: np.stack([o[name] for o in per_scenario], axis=-1) for name in LIFETIME_COLUMNS}
+
+
+def simulate_range(data: Dict, settings: Dict[str, float], start: int, stop: int,
+                   axes: List[Tuple[str, List]] = INPUT_AXES) -> Dict[str, np.ndarray]:
+    return simulate(engine_params(data), decode_inputs(start, stop, axes), settings)
+
+
+def print_summary(frame, settings: Dict[str, float]) -> None:
+    years = int(settings["years"])
+    print(f"Lebensdauer {years} Jahre: PV -{settings['pv_degradation']:.1%}/a, Speicher -{settings['battery_fade']:.1%}/a "
+          f"(min. {settings['battery_floor']:.0%}), Wirkungsgrad -{settings['roundtrip_fade']:.1%}/a, "
+          f"Strom +{settings['electricity_inflation']:.1%}/a, Gas +{settings['gas_inflation']:.1%}/a")
+    grouped = frame.groupby("scenario", sort=False)
+    summary = grouped.agg(
+        autarky_lifetime=("lifetime_autarky_pct", "mean"),
+        autarky_last_year=("autarky_last_year_pct", "mean"),
+        grid_import_mwh=("cumulative_grid_import", lambda s: s.mean() / 1000),
+        break_even_static=("break_even_years", "median"),
+        break_even_lifetime=("break_even_lifetime_years", "median"),
+    )
+    summary["no_break_even"] = grouped["break_even_lifetime_years"].apply(lambda s: int(s.isna().sum()))
+    print(summary.round(2).to_string())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Lebensdauer-Simulation (Degradation, Alterung, Preissteigerung)")
+    parser.add_argument("--years", type=int, help=f"Simulationsjahre (Standard: {LIFETIME_DEFAULTS['years']})")
+    parser.add_argument("--pv-degradation", type=float, help="PV-Degradation in %%/a")
+    parser.add_argument("--battery-fade", type=float, help="Kapazitaetsverlust Speicher in %%/a")
+    parser.add_argument("--roundtrip-fade", type=float, help="Wirkungsgradverlust Speicher in %%/a")
+    parser.add_argument("--axes", type=Path, help="Achsen-JSON (Standard: INPUT_AXES)")
+    parser.add_argument("--chunk-size", type=int, default=200_000, help="Zeilen je Rechenblock")
+    parser.add_argument("--output", type=Path, help="Ergebnisse je Zeile und Szenario als CSV")
+    args = parser.parse_args()
+
+    import pandas as pd
+
+    from matrix_store import result_frame
+    from modernisierung_core import load_axes
+
+    def pct(value: Optional[float]) -> Optional[float]:
+        return None if value is None else value / 100
+
+    data = load_data()
+    settings = lifetime_settings(data, years=args.years, pv_degradation=pct(args.pv_degradation),
+                                 battery_fade=pct(args.battery_fade), roundtrip_fade=pct(args.roundtrip_fade))
+    axes = load_axes(args.axes) if args.axes else INPUT_AXES
+    total = matrix_size(axes)
+    frames = []
+    for lo in range(0, total, args.chunk_size):
+        hi = min(total, lo + args.chunk_size)
+        frames.append(result_frame(decode_inputs(lo, hi, axes), simulate_range(data, settings, lo, hi, axes)))
+    frame = pd.concat(frames, ignore_index=True)
+    print_summary(frame, settings)
+    if args.output:
+        frame.to_csv(args.output, index=False)
+        print(f"Geschrieben: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
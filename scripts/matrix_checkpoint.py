@@ -0,0 +1,117 @@
+"""
+Checkpoints fuer lange Matrix-Laeufe (nur Standardbibliothek).
+
+Der Bereich [start, stop) des Achsen-Produkts wird in Bloecke fester Groesse geteilt. Ein
+Manifest haelt Achsen, data.json-Hash, Rechenkern-Hash, Bereich, Blockgroesse und die fertigen
+Bloecke fest; ein erneuter Lauf mit gleicher Konfiguration rechnet nur die fehlenden Bloecke.
+Nach Aenderungen an modernisierung_core/-batch passt der Rechenkern-Hash nicht mehr, der Lauf
+beginnt dann von vorn statt veraltete Ergebnisse weiterzuverwenden. Jeder Block
+wird vor dem Eintrag ins Manifest vollstaendig geschrieben (tmp + replace), ein Abbruch
+verliert also hoechstens die gerade laufenden Bloecke.
+
+ResultCheckpoint legt die Ergebnisse des Skalar-Laufs (xlsx) je Block als JSON ab; der
+Memory-Mapped-Store (matrix_store) nutzt dieselben Bloecke und fuehrt sie in seinem Manifest.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from modernisierung_core import TestResult, matrix_size
+
+MANIFEST_NAME = "manifest.json"
+# Diese Felder muessen uebereinstimmen, damit ein Lauf fortgesetzt werden darf
+RESUME_KEYS = ("axes", "data_hash", "engine_hash", "start", "stop")
+# Quellen, deren Aenderung bestehende Ergebnisse ungueltig macht
+ENGINE_SOURCES = ("modernisierung_core.py", "modernisierung_batch.py")
+
+
+def chunk_ranges(start: int, stop: int, chunk_size: int) -> List[Tuple[int, int]]:
+    return [(lo, min(lo + chunk_size, stop)) for lo in range(start, stop, max(1, chunk_size))]
+
+
+def engine_hash() -> str:
+    """SHA-256 ueber die Quelltexte des Rechenkerns (Konstanten und Regeln)."""
+    digest = hashlib.sha256()
+    for name in ENGINE_SOURCES:
+        digest.update((Path(__file__).resolve().parent / name).read_bytes())
+    return digest.hexdigest()
+
+
+def run_config(axes: List[Tuple[str, List]], digest: str, start: int = 0, stop: Optional[int] = None) -> Dict:
+    """Konfiguration eines Laufs in Manifest-Form (Achsen als Listen wie nach JSON-Round-Trip)."""
+    return {
+        "axes": [[name, list(values)] for name, values in axes],
+        "data_hash": digest,
+        "engine_hash": engine_hash(),
+        "start": start,
+        "stop": matrix_size(axes) if stop is None else stop,
+    }
+
+
+def resumable(manifest: Optional[Dict], config: Dict) -> bool:
+    return manifest is not None and all(manifest.get(key) == config[key] for key in RESUME_KEYS)
+
+
+def read_manifest(path: Path) -> Optional[Dict]:
+    try:
+        return json.loads((Path(path) / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def write_manifest(path: Path, manifest: Dict) -> None:
+    tmp = Path(path) / f"{MANIFEST_NAME}.tmp"
+    tmp.write_text(json.dumps(manifest, indent=2, ensure_ascii=False), encoding="utf-8")
+    tmp.replace(Path(path) / MANIFEST_NAME)
+
+
+class ResultCheckpoint:
+    """Block-Checkpoints fuer den Skalar-Lauf: je Block eine JSON-Datei mit den TestResults."""
+
+    def __init__(self, path: Path, config: Dict, chunk_size: int) -> None:
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        manifest = read_manifest(self.path)
+        self.resumed = resumable(manifest, config)
+        if self.resumed:
+            self.manifest = manifest
+        else:
+            for stale in self.path.glob("chunk-*.json"):
+                stale.unlink()
+            self.manifest = {**config, "chunk_size": chunk_size, "chunks_done": [], "complete": False}
+            write_manifest(self.path, self.manifest)
+        self.ranges = chunk_ranges(self.manifest["start"], self.manifest["stop"], self.manifest["chunk_size"])
+        self.done = set(self.manifest["chunks_done"])
+
+    def pending(self) -> List[Tuple[int, int, int]]:
+        return [(k, lo, hi) for k, (lo, hi) in enumerate(self.ranges) if k not in self.done]
+
+    def _chunk_path(self, k: int) -> Path:
+        width = max(6, int(math.log10(max(1, len(self.ranges)))) + 1)
+        return self.path / f"chunk-{k:0{width}d}.json"
+
+    def save(self, k: int, results: List[TestResult]) -> None:
+        target = self._chunk_path(k)
+        tmp = target.with_suffix(".json.tmp")
+        # JSON gibt Python-floats (inkl. NaN) exakt zurueck -> identische Ausgabe beim Fortsetzen
+        tmp.write_text(json.dumps([asdict(r) for r in results], ensure_ascii=False), encoding="utf-8")
+        tmp.replace(target)
+        self.done.add(k)
+        self.manifest["chunks_done"] = sorted(self.done)
+        self.manifest["complete"] = len(self.done) == len(self.ranges)
+        write_manifest(self.path, self.manifest)
+
+    def results(self) -> Iterator[TestResult]:
+        """Alle Ergebnisse in Matrix-Reihenfolge; setzt einen vollstaendigen Checkpoint voraus."""
+        missing = [k for k, _, _ in self.pending()]
+        if missing:
+            raise ValueError(f"Checkpoint unvollstaendig, {len(missing)} Bloecke fehlen")
+        for k in range(len(self.ranges)):
+            for raw in json.loads(self._chunk_path(k).read_text(encoding="utf-8")):
+                yield TestResult(**raw)
@@ -0,0 +1,180 @@
+"""
+Vergleich zweier Matrix-Laeufe, z.B. vor/nach Aenderung von HEATPUMP_EXTRA oder einem data.json-Preis.
+
+Beide Ergebnismengen werden per Hash-Join (pandas merge) ueber Eingaben + Szenario verbunden.
+Berichtet Status-Wechsel (ok -> warning -> error), numerische Deltas je Spalte und die groessten
+Ausreisser. Quellen: xlsx/csv der Testmatrix, ein Store-Verzeichnis (matrix_store) oder eine
+data.json-Variante, die direkt mit dem vektorisierten Rechenkern ausgewertet wird.
+
+Aufruf:
+    python scripts/matrix_diff.py alt.xlsx neu.xlsx
+    python scripts/matrix_diff.py data/data.json /tmp/data_neu.json --fail-on-status-change
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from modernisierung_core import INPUT_AXES, matrix_size
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+KEY_COLUMNS: List[str] = [name for name, _ in INPUT_AXES] + ["scenario"]
+STATUS_ORDER = {"ok": 0, "warning": 1, "error": 2}
+IGNORED_COLUMNS = {"issue_flags", "warning_flags"}
+
+
+def load_results(source: Path, axes: List[Tuple[str, List]] = INPUT_AXES) -> pd.DataFrame:
+    import pandas as pd
+
+    source = Path(source)
+    if source.is_dir():
+        from matrix_store import MatrixStore
+
+        return MatrixStore(source).to_dataframe()
+    if source.suffix == ".json":
+        from matrix_store import result_frame
+        from modernisierung_batch import decode_inputs, evaluate_range
+
+        data = json.loads(source.read_text(encoding="utf-8"))
+        total = matrix_size(axes)
+        return result_frame(decode_inputs(0, total, axes), evaluate_range(data, 0, total, axes))
+    if source.suffix == ".csv":
+        return pd.read_csv(source)
+    return pd.read_excel(source, sheet_name="Testmatrix")
+
+
+def diff_results(a: pd.DataFrame, b: pd.DataFrame, columns: Optional[List[str]] = None,
+                 rtol: float = 1e-6, atol: float = 1e-9) -> Dict:
+    """Verbindet a und b ueber KEY_COLUMNS und liefert Status-Wechsel sowie Deltas je Spalte."""
+    import pandas as pd
+
+    key = [c for c in KEY_COLUMNS if c in a.columns and c in b.columns]
+    if columns is None:
+        numeric_a = set(a.select_dtypes("number").columns)
+        columns = [c for c in b.select_dtypes("number").columns
+                   if c in numeric_a and c not in key and c not in IGNORED_COLUMNS]
+    cols = key + [c for c in ("status",) if c in a.columns and c in b.columns] + columns
+    merged = a[cols].merge(b[cols], on=key, how="outer", suffixes=("_a", "_b"), indicator=True)
+
+    both = merged[merged["_merge"] == "both"]
+    report: Dict = {
+        "key": key,
+        "rows_a": len(a),
+        "rows_b": len(b),
+        "only_a": merged[merged["_merge"] == "left_only"][key],
+        "only_b": merged[merged["_merge"] == "right_only"][key],
+        "matched": len(both),
+        "deltas": {},
+        "changed_mask": np.zeros(len(both), dtype=bool),
+        "joined": both,
+    }
+
+    if "status_a" in both.columns:
+        changed = both["status_a"] != both["status_b"]
+        report["status_changes"] = pd.crosstab(both["status_a"][changed], both["status_b"][changed])
+        direction = both["status_b"].map(STATUS_ORDER) - both["status_a"].map(STATUS_ORDER)
+        report["status_worse"] = int((direction > 0).sum())
+        report["status_better"] = int((direction < 0).sum())
+        report["status_changed_rows"] = both[changed]
+        report["changed_mask"] |= changed.to_numpy()
+
+    for col in columns:
+        va = both[f"{col}_a"].to_numpy(dtype=float)
+        vb = both[f"{col}_b"].to_numpy(dtype=float)
+        delta = vb - va
+        same = np.isclose(va, vb, rtol=rtol, atol=atol, equal_nan=True)
+        report["changed_mask"] |= ~same
+        finite = np.isfinite(delta) & ~same
+        stats = {
+            "changed": int((~same).sum()),
+            "nan_changed": int((np.isnan(va) != np.isnan(vb)).sum()),
+        }
+        if finite.any():
+            d = delta[finite]
+            stats.update(mean=float(d.mean()), std=float(d.std()), min=float(d.min()), max=float(d.max()),
+                         mean_abs=float(np.abs(d).mean()))
+        report["deltas"][col] = stats
+    return report
+
+
+def top_movers(report: Dict, column: str, n: int = 10) -> pd.DataFrame:
+    both = report["joined"]
+    delta = both[f"{column}_b"].astype(float) - both[f"{column}_a"].astype(float)
+    order = np.argsort(-np.nan_to_num(np.abs(delta.to_numpy()), nan=-1.0), kind="stable")[:n]
+    movers = both.iloc[order][report["key"] + [f"{column}_a", f"{column}_b"]].copy()
+    movers["delta"] = delta.iloc[order].to_numpy()
+    return movers[np.abs(movers["delta"].fillna(np.inf)) > 0]
+
+
+def print_report(report: Dict, top: int, top_column: Optional[str]) -> None:
+    print(f"Zeilen: A {report['rows_a']}, B {report['rows_b']}, verbunden {report['matched']}, "
+          f"nur A {len(report['only_a'])}, nur B {len(report['only_b'])}")
+    print(f"Geaenderte Zeilen (Status oder Werte): {int(report['changed_mask'].sum())}")
+
+    if "status_changes" in report:
+        print(f"\n=== STATUS-WECHSEL (schlechter {report['status_worse']}, besser {report['status_better']}) ===")
+        if report["status_changes"].empty:
+            print("  keine")
+        else:
+            print(report["status_changes"].to_string())
+
+    print("\n=== DELTAS JE SPALTE (B - A) ===")
+    changed_cols = {c: s for c, s in report["deltas"].items() if s["changed"]}
+    if not changed_cols:
+        print("  keine Abweichungen")
+    for col, s in changed_cols.items():
+        line = f"  {col:20s} geaendert {s['changed']:7d}"
+        if "mean" in s:
+            line += (f" | mean {s['mean']:+.3f} std {s['std']:.3f} min {s['min']:+.3f} "
+                     f"max {s['max']:+.3f} |mean| {s['mean_abs']:.3f}")
+        if s["nan_changed"]:
+            line += f" | NaN-Wechsel {s['nan_changed']}"
+        print(line)
+
+    columns = [top_column] if top_column else sorted(changed_cols, key=lambda c: -changed_cols[c]["changed"])[:3]
+    for col in columns:
+        movers = top_movers(report, col, top)
+        if len(movers):
+            print(f"\n=== TOP {len(movers)} AUSREISSER: {col} ===")
+            print(movers.to_string(index=False))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Zwei Matrix-Laeufe vergleichen (Hash-Join ueber Eingaben + Szenario)")
+    parser.add_argument("a", type=Path, help="xlsx/csv, Store-Verzeichnis oder data.json (Referenz)")
+    parser.add_argument("b", type=Path, help="xlsx/csv, Store-Verzeichnis oder data.json (neu)")
+    parser.add_argument("--axes", type=Path, help="Achsen-JSON fuer data.json-Quellen")
+    parser.add_argument("--columns", nargs="+", help="Nur diese numerischen Spalten vergleichen")
+    parser.add_argument("--top", type=int, default=10, help="Anzahl Ausreisser je Spalte")
+    parser.add_argument("--top-column", help="Ausreisser nur fuer diese Spalte")
+    parser.add_argument("--rtol", type=float, default=1e-6)
+    parser.add_argument("--atol", type=float, default=1e-9)
+    parser.add_argument("--output", type=Path, help="Geaenderte Zeilen als CSV schreiben")
+    parser.add_argument("--fail-on-status-change", action="store_true",
+                        help="Exit-Code 1 bei Status-Wechseln oder fehlenden Zeilen (Regressionscheck)")
+    args = parser.parse_args()
+
+    from modernisierung_core import load_axes
+
+    axes = load_axes(args.axes) if args.axes else INPUT_AXES
+    report = diff_results(load_results(args.a, axes), load_results(args.b, axes), args.columns, args.rtol, args.atol)
+    print_report(report, args.top, args.top_column)
+
+    if args.output:
+        report["joined"][report["changed_mask"]].to_csv(args.output, index=False)
+        print(f"\nGeaenderte Zeilen geschrieben: {args.output}")
+
+    status_changed = len(report.get("status_changed_rows", ())) + len(report["only_a"]) + len(report["only_b"])
+    if args.fail_on_status_change and status_changed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Deterministische Aufteilung der Testmatrix auf mehrere Rechner und Zusammenfuehrung der Teile.
+
+Jeder Shard ist ein eigenstaendiger Store (siehe matrix_store) mit Manifest, das data.json-Hash,
+Achsen und den Bereich im Achsen-Produkt festhaelt. Merge prueft Konsistenz und Vollstaendigkeit.
+
+Aufruf:
+    python scripts/modernisierung_tests.py --shard 2/4 --memmap out/shard-2
+    python scripts/matrix_shards.py merge out/matrix out/shard-*
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+from typing import List, Tuple
+
+from matrix_store import DEFAULT_CHUNK_SIZE, MatrixStore, create_store, mark_complete, split_range
+
+
+def parse_shard(raw: str) -> Tuple[int, int]:
+    """'i/N' mit 1 <= i <= N."""
+    try:
+        index, count = (int(part) for part in raw.split("/"))
+    except ValueError:
+        raise ValueError(f"Shard muss als i/N angegeben werden, nicht {raw!r}") from None
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Ungueltiger Shard {raw!r} (erwartet 1 <= i <= N)")
+    return index, count
+
+
+def shard_range(index: int, count: int, total: int) -> Tuple[int, int]:
+    """Bereich [start, stop) von Shard index/count; unabhaengig von Rechner und Worker-Anzahl."""
+    if count > total:
+        # Ueberzaehlige Shards bekommen einen leeren Bereich am Ende
+        return (index - 1, index) if index <= total else (total, total)
+    return split_range(0, total, count)[index - 1]
+
+
+def validate_shards(stores: List[MatrixStore]) -> None:
+    """Bricht mit ValueError ab, wenn die Teile nicht zusammenpassen oder Luecken/Ueberlappungen haben."""
+    if not stores:
+        raise ValueError("Keine Shards angegeben")
+    ref = stores[0].manifest
+    for store in stores:
+        m = store.manifest
+        for key in ("data_hash", "engine_hash", "axes", "total", "scenarios", "columns"):
+            if m.get(key) != ref.get(key):
+                raise ValueError(f"{store.path}: '{key}' weicht von {stores[0].path} ab")
+        if not m.get("complete"):
+            raise ValueError(f"{store.path}: Shard ist nicht vollstaendig berechnet")
+        if m.get("shard", {}).get("count") != ref.get("shard", {}).get("count"):
+            raise ValueError(f"{store.path}: Shard-Anzahl weicht von {stores[0].path} ab")
+
+    pos = 0
+    for store in sorted(stores, key=lambda s: (s.start, s.stop)):
+        if store.start != pos:
+            kind = "Luecke" if store.start > pos else "Ueberlappung"
+            raise ValueError(f"{kind} bei Position {pos} (naechster Shard {store.path} beginnt bei {store.start})")
+        pos = store.stop
+    if pos != ref["total"]:
+        raise ValueError(f"Shards decken nur {pos} von {ref['total']} Zeilen ab")
+
+
+def merge_shards(out: Path, paths: List[Path], chunk_size: int = DEFAULT_CHUNK_SIZE) -> MatrixStore:
+    stores = [MatrixStore(p) for p in paths]
+    validate_shards(stores)
+    ref = stores[0].manifest
+    axes = [(name, values) for name, values in ref["axes"]]
+    merged = create_store(
+        out,
+        ref["data_hash"],
+        axes,
+        extra={
+            # Die Shards wurden mit diesem Rechenkern berechnet, nicht zwingend mit dem aktuellen
+            "engine_hash": ref.get("engine_hash"),
+            "merged_from": [{"path": str(s.path), "start": s.start, "stop": s.stop} for s in stores],
+        },
+    )
+    for store in stores:
+        for flat_start, block in store.iter_chunks(store.columns, chunk_size):
+            rows = slice(flat_start, flat_start + len(block[store.columns[0]]))
+            for name, values in block.items():
+                merged.column(name)[rows] = values
+    mark_complete(merged)
+    return MatrixStore(merged.path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Shards der Testmatrix pruefen und zusammenfuehren")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_merge = sub.add_parser("merge", help="Shards validieren und zu einem Store zusammenfuehren")
+    p_merge.add_argument("out", type=Path)
+    p_merge.add_argument("shards", type=Path, nargs="+")
+    p_check = sub.add_parser("check", help="Shards nur validieren")
+    p_check.add_argument("shards", type=Path, nargs="+")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "check":
+            validate_shards([MatrixStore(p) for p in args.shards])
+            print(f"[OK] {len(args.shards)} Shards konsistent und vollstaendig")
+        else:
+            merged = merge_shards(args.out, args.shards)
+            print(f"[DONE] {len(args.shards)} Shards zusammengefuehrt: {merged.path} ({len(merged)} Zeilen)")
+    except ValueError as exc:
+        raise SystemExit(f"[ERROR] {exc}") from exc
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""
+Out-of-core Ergebnisablage fuer grosse Matrix-Laeufe.
+
+Jede Ergebnisspalte liegt als vorab angelegte .npy-Datei (Form: Zeilen x Szenarien) im
+Store-Verzeichnis und wird per Memory-Mapping beschrieben bzw. gelesen. Zeile i entspricht
+der flachen Position start + i im Achsen-Produkt, d.h. jede Zeile ist ueber flat_index()
+aus ihrem Eingabe-Tupel auffindbar. Worker fuellen disjunkte Bereiche direkt in den Dateien.
+Fertige Bloecke werden im Manifest gefuehrt (matrix_checkpoint); ein abgebrochener Lauf mit
+gleichen Achsen, Annahmen und Bereich wird beim naechsten Aufruf fortgesetzt.
+
+Aufruf:
+    python scripts/matrix_store.py summary STORE_DIR
+    python scripts/matrix_store.py lookup STORE_DIR houseType=reihenhaus area=150 ...
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from modernisierung_batch import (
+    COLUMN_DTYPES,
+    ISSUE_MESSAGES,
+    STATUS_LABELS,
+    WARNING_MESSAGES,
+    evaluate_range,
+    flags_to_messages,
+)
+from matrix_checkpoint import MANIFEST_NAME, chunk_ranges, read_manifest, resumable, run_config, write_manifest
+from modernisierung_core import INPUT_AXES, SCENARIOS, data_hash, flat_index, inputs_at, matrix_size
+
+DEFAULT_CHUNK_SIZE = 200_000
+
+
+class MatrixStore:
+    """Lesender/schreibender Zugriff auf ein Store-Verzeichnis, ohne Spalten komplett zu laden."""
+
+    def __init__(self, path: Path, mode: str = "r") -> None:
+        self.path = Path(path)
+        self.mode = mode
+        self.manifest = json.loads((self.path / MANIFEST_NAME).read_text(encoding="utf-8"))
+        self.axes: List[Tuple[str, List]] = [(name, values) for name, values in self.manifest["axes"]]
+        self.start: int = self.manifest["start"]
+        self.stop: int = self.manifest["stop"]
+        self._columns: Dict[str, np.memmap] = {}
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.manifest["columns"])
+
+    def column(self, name: str) -> np.memmap:
+        if name not in self._columns:
+            self._columns[name] = np.load(self.path / f"{name}.npy", mmap_mode=self.mode)
+        return self._columns[name]
+
+    def row_of(self, inp: Dict) -> int:
+        idx = flat_index(inp, self.axes)
+        if not self.start <= idx < self.stop:
+            raise IndexError(f"Eingabe liegt ausserhalb des Store-Bereichs [{self.start}, {self.stop})")
+        return idx - self.start
+
+    def lookup(self, inp: Dict) -> List[Dict]:
+        row = self.row_of(inp)
+        results = []
+        for s_idx, (label, _, _) in enumerate(SCENARIOS):
+            # float32 ueber str() zurueckwandeln, damit 0.35 nicht als 0.3499999940395355 erscheint
+            outputs = {name: _to_python(self.column(name)[row, s_idx]) for name in self.columns}
+            outputs["status"] = STATUS_LABELS[outputs["status"]]
+            results.append({"scenario": label, **outputs})
+        return results
+
+    def iter_chunks(self, names: List[str], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Tuple[int, Dict[str, np.ndarray]]]:
+        """Liefert (flat_start, {spalte: block}) blockweise, damit nie alles im RAM liegt."""
+        for lo in range(0, len(self), chunk_size):
+            hi = min(lo + chunk_size, len(self))
+            yield self.start + lo, {name: np.asarray(self.column(name)[lo:hi]) for name in names}
+
+    def to_dataframe(self, lo: int = 0, hi: Optional[int] = None):
+        """Ausschnitt [lo, hi) (Store-Zeilen) als DataFrame im Format von modernisierung_tests.to_dataframe."""
+        from modernisierung_batch import decode_inputs
+
+        hi = len(self) if hi is None else min(hi, len(self))
+        inputs = decode_inputs(self.start + lo, self.start + hi, self.axes)
+        return result_frame(inputs, {name: self.column(name)[lo:hi] for name in self.columns})
+
+    def flush(self) -> None:
+        for arr in self._columns.values():
+            if isinstance(arr, np.memmap):
+                arr.flush()
+
+
+def result_frame(inputs: Dict[str, np.ndarray], columns: Dict[str, np.ndarray]):
+    """Eingabespalten (n,) und Ergebnisspalten (n, Szenarien) als flaches DataFrame, eine Zeile je Szenario."""
+    import pandas as pd
+
+    n = len(next(iter(inputs.values())))
+    n_scen = len(SCENARIOS)
+    frame = {name: np.repeat(values, n_scen) for name, values in inputs.items()}
+    frame["scenario"] = np.tile([label for label, _, _ in SCENARIOS], n)
+    for name, values in columns.items():
+        values = np.asarray(values).reshape(-1)
+        frame[name] = np.asarray(STATUS_LABELS)[values] if name == "status" else values
+    for name, flag_col, messages in (("issues", "issue_flags", ISSUE_MESSAGES),
+                                     ("warnings", "warning_flags", WARNING_MESSAGES)):
+        if flag_col not in frame:
+            continue
+        codes, inverse = np.unique(frame[flag_col], return_inverse=True)
+        texts = np.asarray(["; ".join(flags_to_messages(code, messages)) for code in codes], dtype=object)
+        frame[name] = texts[inverse.reshape(-1)]
+    return pd.DataFrame(frame)
+
+
+def _to_python(value: np.generic):
+    if isinstance(value, np.floating):
+        # Fehlender Wert (z.B. Break-even) wie in scenario_calculations als None
+        return None if np.isnan(value) else float(str(value))
+    return value.item()
+
+
+def create_store(path: Path, digest: str, axes: List[Tuple[str, List]] = INPUT_AXES,
+                 start: int = 0, stop: Optional[int] = None, extra: Optional[Dict] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE) -> MatrixStore:
+    """Legt Manifest und leere Spaltendateien fuer die Positionen [start, stop) an.
+
+    `digest` ist der data_hash() der verwendeten Annahmen; `complete` wird erst nach dem
+    vollstaendigen Befuellen gesetzt (mark_complete).
+    """
+    path = Path(path)
+    total = matrix_size(axes)
+    stop = total if stop is None else stop
+    if not 0 <= start <= stop <= total:
+        raise ValueError(f"Ungueltiger Bereich [{start}, {stop}) fuer Matrix mit {total} Zeilen")
+    path.mkdir(parents=True, exist_ok=True)
+    manifest = {
+        **run_config(axes, digest, start, stop),
+        "total": total,
+        "scenarios": [label for label, _, _ in SCENARIOS],
+        "columns": COLUMN_DTYPES,
+        "complete": False,
+        "chunk_size": chunk_size,
+        "chunks_done": [],
+        **(extra or {}),
+    }
+    for name, dtype in COLUMN_DTYPES.items():
+        arr = open_memmap(path / f"{name}.npy", mode="w+", dtype=dtype, shape=(stop - start, len(SCENARIOS)))
+        del arr
+    write_manifest(path, manifest)
+    return MatrixStore(path, mode="r+")
+
+
+def open_store(path: Path, digest: str, axes: List[Tuple[str, List]] = INPUT_AXES, start: int = 0,
+               stop: Optional[int] = None, extra: Optional[Dict] = None,
+               chunk_size: int = DEFAULT_CHUNK_SIZE) -> Tuple[MatrixStore, bool]:
+    """Setzt einen passenden Store fort (Blockgroesse aus dessen Manifest) oder legt ihn neu an."""
+    manifest = read_manifest(path)
+    if resumable(manifest, run_config(axes, digest, start, stop)) and "chunks_done" in manifest:
+        return MatrixStore(path, mode="r+"), True
+    return create_store(path, digest, axes, start, stop, extra, chunk_size), False
+
+
+def mark_chunk_done(store: MatrixStore, chunk: int) -> None:
+    """Block als fertig eintragen; die Daten muessen bereits geflusht sein (fill_range)."""
+    store.manifest["chunks_done"] = sorted({*store.manifest["chunks_done"], chunk})
+    write_manifest(store.path, store.manifest)
+
+
+def mark_complete(store: MatrixStore) -> None:
+    store.flush()
+    store.manifest["complete"] = True
+    write_manifest(store.path, store.manifest)
+
+
+def fill_range(path: Path, data: Dict, lo: int, hi: int, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """Berechnet die flachen Positionen [lo, hi) und schreibt sie in-place in den Store."""
+    store = MatrixStore(path, mode="r+")
+    if data_hash(data) != store.manifest["data_hash"]:
+        raise ValueError("data.json passt nicht zum Store-Manifest")
+    for chunk_lo in range(lo, hi, chunk_size):
+        chunk_hi = min(chunk_lo + chunk_size, hi)
+        result = evaluate_range(data, chunk_lo, chunk_hi, store.axes)
+        rows = slice(chunk_lo - store.start, chunk_hi - store.start)
+        for name in store.columns:
+            store.column(name)[rows] = result[name]
+    store.flush()
+    return hi - lo
+
+
+def split_range(start: int, stop: int, parts: int) -> List[Tuple[int, int]]:
+    """Teilt [start, stop) in hoechstens `parts` zusammenhaengende, disjunkte Bereiche."""
+    parts = max(1, min(parts, stop - start))
+    size, rest = divmod(stop - start, parts)
+    ranges = []
+    lo = start
+    for i in range(parts):
+        hi = lo + size + (1 if i < rest else 0)
+        ranges.append((lo, hi))
+        lo = hi
+    return ranges
+
+
+def run_matrix(path: Path, data: Dict, axes: List[Tuple[str, List]] = INPUT_AXES, workers: int = 1,
+               start: int = 0, stop: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+               extra: Optional[Dict] = None) -> MatrixStore:
+    if workers > 1:
+        # Mehr Bloecke als Worker, damit ungleich schnelle Bereiche sich ausgleichen
+        total = (matrix_size(axes) if stop is None else stop) - start
+        chunk_size = max(1, min(chunk_size, -(-total // (workers * 4))))
+    store, resumed = open_store(path, data_hash(data), axes, start, stop, extra, chunk_size)
+    # Beim Fortsetzen gilt die Blockteilung des bestehenden Manifests
+    chunk_size = store.manifest["chunk_size"]
+    chunks = chunk_ranges(store.start, store.stop, chunk_size)
+    done = set(store.manifest["chunks_done"])
+    pending = [(k, lo, hi) for k, (lo, hi) in enumerate(chunks) if k not in done]
+    if resumed:
+        print(f"[INFO] Setze {store.path} fort: {len(done)} von {len(chunks)} Bloecken bereits fertig")
+    if workers <= 1:
+        for k, lo, hi in pending:
+            fill_range(store.path, data, lo, hi, chunk_size)
+            mark_chunk_done(store, k)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(fill_range, store.path, data, lo, hi, chunk_size): k for k, lo, hi in pending}
+            for fut in as_completed(futures):
+                fut.result()
+                mark_chunk_done(store, futures[fut])
+    mark_complete(store)
+    return MatrixStore(store.path)
+
+
+def status_counts(store: MatrixStore, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, int]:
+    counts = np.zeros(len(STATUS_LABELS), dtype=np.int64)
+    for _, block in store.iter_chunks(["status"], chunk_size):
+        counts += np.bincount(block["status"].reshape(-1), minlength=len(STATUS_LABELS))
+    return dict(zip(STATUS_LABELS, counts.tolist()))
+
+
+def parse_assignment(raw: str, axes: List[Tuple[str, List]]) -> Tuple[str, object]:
+    name, _, value = raw.partition("=")
+    values = dict(axes).get(name)
+    if values is None:
+        raise SystemExit(f"Unbekannte Achse: {name}")
+    for candidate in values:
+        if str(candidate).lower() == value.lower():
+            return name, candidate
+    raise SystemExit(f"Wert {value!r} nicht auf Achse {name} ({values})")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Memory-mapped Matrix-Ergebnisse auswerten")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_summary = sub.add_parser("summary", help="Status-Verteilung blockweise zaehlen")
+    p_summary.add_argument("store", type=Path)
+    p_lookup = sub.add_parser("lookup", help="Ergebnis einer Eingabe ueber ihren flachen Index lesen")
+    p_lookup.add_argument("store", type=Path)
+    p_lookup.add_argument("inputs", nargs="+", help="achse=wert, z.B. houseType=reihenhaus area=150")
+    args = parser.parse_args()
+
+    store = MatrixStore(args.store)
+    if args.command == "summary":
+        state = "vollstaendig" if store.manifest.get("complete") else "UNVOLLSTAENDIG"
+        print(f"Store: {store.path} (Zeilen {store.start}–{store.stop} von {store.manifest['total']}, {state})")
+        for label, count in status_counts(store).items():
+            print(f"  {label}: {count}")
+    else:
+        inp = dict(parse_assignment(raw, store.axes) for raw in args.inputs)
+        missing = [name for name, _ in store.axes if name not in inp]
+        if missing:
+            raise SystemExit(f"Fehlende Achsen: {', '.join(missing)}")
+        index = flat_index(inp, store.axes)
+        print(json.dumps({"index": index, "inputs": inputs_at(index, store.axes), "results": store.lookup(inp)},
+                         indent=2, ensure_ascii=False, allow_nan=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,496 @@
+"""
+Vektorisierte Auswertung der Testmatrix mit NumPy.
+
+Spiegelt scenario_calculations/validate_rules aus modernisierung_core spaltenweise:
+Eingaben sind Arrays der Laenge n, Annahmen (params) duerfen Skalare oder Arrays sein,
+die gegen (..., n) broadcasten. Ergebnisse haben die Form (..., n, len(SCENARIOS)).
+
+Paritaet zum Skalar-Kern (Kennzahlen, Status, Meldungen) fuer data.json und zufaellig
+verschobene Annahmen pruefen:
+    python scripts/modernisierung_batch.py --self-check
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import math
+import random
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from modernisierung_core import (
+    CLIMATE_EXTRA,
+    COMBUSTION_CO2,
+    COMBUSTION_FUEL_COST,
+    EV_CO2_MIX,
+    EV_CO2_SAVING,
+    EV_KWH_PER_YEAR,
+    HEATPUMP_EXTRA,
+    INPUT_AXES,
+    MIN_FEEDIN_SHARE,
+    MIN_GRID_IMPORT,
+    SCENARIOS,
+    axes_shape,
+    inputs_at,
+    load_axes,
+    load_data,
+    matrix_size,
+    pv_house_limit,
+    result_status,
+    scenario_calculations,
+)
+
+HOUSE_KEYS = {"reihenhaus": "reihenhaus", "doppelhaus": "doppelhaus", "einfamilienhaus": "freistehend"}
+INSULATIONS = ["schlecht", "normal", "gut"]
+
+# Annahmen aus data.json, die der Rechenkern liest (Pfade mit Punkt getrennt)
+PARAM_PATHS: List[str] = [
+    "consumption.per_person",
+    *[
+        f"consumption.heating_per_sqm.{house_key}.{ins}"
+        for house_key in ("reihenhaus", "doppelhaus", "freistehend")
+        for ins in INSULATIONS
+    ],
+    "prices.electricity_eur_per_kwh",
+    "prices.gas_eur_per_kwh",
+    "prices.feed_in_eur_per_kwh",
+    "pv.yield_per_kwp",
+    "pv.cost_per_kwp",
+    "battery.cost_per_kwh",
+    "heatpump.cost_per_kw",
+    "heatpump.full_load_hours",
+    "co2.electricity_factor",
+    "co2.gas_factor",
+]
+
+# Annahmen, die nur Kosten und CO2 beeinflussen; Verbrauch, Dimensionierung und Energiebilanz
+# (energy_stage) bleiben bei ihrer Aenderung unveraendert
+ECONOMIC_PATHS: List[str] = [
+    "prices.electricity_eur_per_kwh",
+    "prices.gas_eur_per_kwh",
+    "prices.feed_in_eur_per_kwh",
+    "pv.cost_per_kwp",
+    "battery.cost_per_kwh",
+    "heatpump.cost_per_kw",
+    "heatpump.full_load_hours",
+    "co2.electricity_factor",
+    "co2.gas_factor",
+]
+# Ergebnisse von energy_stage je Szenario (letzte Achse)
+ENERGY_COLUMNS: List[str] = ["pv_kwp", "battery_kwh", "grid_import", "feed_in", "autarky_pct", "ev_from_batt"]
+
+# Reihenfolge entspricht den outputs-Keys von scenario_calculations
+OUTPUT_COLUMNS: List[str] = [
+    "pv_kwp",
+    "battery_kwh",
+    "grid_import",
+    "feed_in",
+    "autarky_pct",
+    "pv_generation",
+    "co2_today",
+    "co2_after",
+    "co2_saving",
+    "break_even_years",
+    "annual_cost_post",
+    "total_cost",
+    "household_block",
+    "climate_block",
+    "ev_block",
+    "heatpump_block",
+    "heating_demand",
+    "ev_from_batt",
+]
+
+# Anzeige-Rundung (Nachkommastellen) wie in scenario_calculations; Bloecke bleiben ungerundet
+OUTPUT_DIGITS: Dict[str, int] = {
+    "pv_kwp": 2,
+    "battery_kwh": 2,
+    "grid_import": 0,
+    "feed_in": 0,
+    "autarky_pct": 1,
+    "pv_generation": 0,
+    "co2_today": 1,
+    "co2_after": 1,
+    "co2_saving": 1,
+    "break_even_years": 1,
+    "annual_cost_post": 0,
+    "total_cost": 0,
+    "ev_from_batt": 0,
+}
+
+# Von _validate gelesene Kennzahlen; nur diese werden bei round_outputs=False gerundet
+VALIDATED_COLUMNS: Tuple[str, ...] = ("pv_kwp", "battery_kwh", "grid_import", "autarky_pct", "co2_saving",
+                                      "break_even_years")
+
+STATUS_LABELS: Tuple[str, ...] = ("ok", "warning", "error")
+
+# Bit-Positionen der Meldungen aus validate_rules
+ISSUE_MESSAGES: List[str] = [
+    "PV-Dimensionierung überschreitet Dachlimit",
+    "Speicher größer als 2 Tageserträge",
+    "Klima-Verbrauch nicht sauber getrennt",
+    "EV-Verbrauch nicht sauber getrennt",
+    "WP-Verbrauch nicht sauber getrennt",
+    "CO2-Bilanz verschlechtert sich trotz E-Auto – bitte Rechenkern und Annahmen prüfen.",
+    "Autarkie außerhalb physikalischer Grenzen (>95 % oder <3 %)",
+    "Break-even nicht berechenbar oder negative Einsparung.",
+]
+WARNING_MESSAGES: List[str] = [
+    "Netzbezug zu niedrig (<200 kWh/a)",
+    "CO2-Einsparung durch EV deutlich geringer als erwartet – Annahmen zu Strommix, PV-Anteil oder Fahrleistung prüfen.",
+    "Autarkie außerhalb 12–50 % (Nur PV)",
+    "Autarkie außerhalb 35–85 % (PV+Speicher)",
+    "Autarkie außerhalb 45–90 % (PV+Speicher+WP)",
+    "Break-even sehr lang (>40 Jahre) – wirtschaftlich schwach.",
+]
+
+# Kompakte Speichertypen fuer Ergebnisspalten (siehe matrix_store)
+COLUMN_DTYPES: Dict[str, str] = {
+    **{name: "float32" for name in OUTPUT_COLUMNS},
+    "status": "int8",
+    "issue_flags": "uint16",
+    "warning_flags": "uint16",
+}
+
+
+def engine_params(data: Dict) -> Dict[str, float]:
+    params = {}
+    for path in PARAM_PATHS:
+        cur = data
+        for key in path.split("."):
+            cur = cur[key]
+        params[path] = float(cur)
+    return params
+
+
+def decode_inputs(start: int, stop: int, axes: List[Tuple[str, List]] = INPUT_AXES) -> Dict[str, np.ndarray]:
+    """Eingabespalten fuer die flachen Positionen [start, stop) des Achsen-Produkts."""
+    flat = np.arange(start, stop, dtype=np.int64)
+    positions = np.unravel_index(flat, axes_shape(axes))
+    return {name: np.asarray(values)[pos] for (name, values), pos in zip(axes, positions)}
+
+
+def flags_to_messages(flags: int, messages: List[str]) -> List[str]:
+    return [msg for bit, msg in enumerate(messages) if int(flags) >> bit & 1]
+
+
+def round_like_core(values, ndigits: int) -> np.ndarray:
+    """np.round, an Halbwert-Grenzen aber mit Python-round (Paritaet zum Skalar-Kern)."""
+    values = np.asarray(values, dtype=float)
+    rounded = np.round(values, ndigits)
+    scaled = values * 10.0 ** ndigits
+    near_half = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_half.any():
+        rounded[near_half] = [round(float(v), ndigits) for v in values[near_half]]
+    return rounded
+
+
+def _heating_per_sqm(params: Dict, house: np.ndarray, insulation: np.ndarray) -> np.ndarray:
+    value = np.zeros(house.shape)
+    for house_type, house_key in HOUSE_KEYS.items():
+        for ins in INSULATIONS:
+            mask = (house == house_type) & (insulation == ins)
+            value = np.where(mask, params[f"consumption.heating_per_sqm.{house_key}.{ins}"], value)
+    return value
+
+
+def _house_limit(house: np.ndarray) -> np.ndarray:
+    limit = np.full(house.shape, float(pv_house_limit("")))
+    for house_type in HOUSE_KEYS:
+        limit = np.where(house == house_type, float(pv_house_limit(house_type)), limit)
+    return limit
+
+
+def consumption_blocks(params: Dict, inputs: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    heating_per_sqm = _heating_per_sqm(params, inputs["houseType"], inputs["insulation"])
+    return {
+        "household": inputs["people"] * params["consumption.per_person"],
+        "heating": inputs["area"] * heating_per_sqm,
+        "climate": np.where(inputs["climate"], float(CLIMATE_EXTRA), 0.0),
+        "ev": np.where(inputs["wallbox"], float(EV_KWH_PER_YEAR), 0.0),
+    }
+
+
+def recommend_pv_kwp(total_load: np.ndarray, roof_area: np.ndarray, house: np.ndarray) -> np.ndarray:
+    pv_raw = round_like_core(np.maximum(6, total_load / 900), 1)
+    max_roof = np.maximum(0, np.floor(roof_area / 7))
+    return np.maximum(0, np.minimum(np.minimum(pv_raw, max_roof), _house_limit(house)))
+
+
+def recommend_battery_kwh(total_load: np.ndarray, pv_kwp: np.ndarray, pv_yield) -> np.ndarray:
+    batt = np.maximum(5, np.minimum(12, total_load / 365 * 0.8))
+    daily_pv = (pv_kwp * pv_yield) / 365
+    return np.minimum(batt, daily_pv * 2)
+
+
+def estimate_energy_balance(pv_kwp, battery_kwh, annual_load, pv_yield, has_ev, ev_load, battery_roundtrip=0.83):
+    pv_generation = pv_kwp * pv_yield
+    has_batt = battery_kwh > 0
+    direct_share = np.where(has_batt, 0.32, 0.27)
+    direct_self = np.minimum(annual_load * direct_share, pv_generation * 0.9)
+    pv_surplus = np.maximum(0, pv_generation - direct_self)
+
+    annual_batt_input = np.minimum(pv_surplus, battery_kwh * 0.7 * 365)
+    battery_output = annual_batt_input * battery_roundtrip
+
+    potential_self = direct_self + battery_output
+    max_autarky = np.where(has_batt, 0.75, 0.4)
+    ratio = np.divide(potential_self, annual_load, out=np.zeros(np.broadcast(potential_self, annual_load).shape),
+                      where=annual_load != 0)
+    autarky = np.minimum(max_autarky, ratio)
+    self_use = autarky * annual_load
+
+    feed_in = np.maximum(0, pv_generation - self_use)
+    # Mindest-Einspeisung
+    min_feed = pv_generation * MIN_FEEDIN_SHARE
+    below_min = feed_in < min_feed
+    feed_in = np.where(below_min, min_feed, feed_in)
+    self_use = np.where(below_min, np.maximum(0, pv_generation - feed_in), self_use)
+    grid = np.maximum(0, annual_load - self_use)
+
+    ev_from_batt = np.where(has_ev & has_batt, np.minimum(ev_load * 0.7, battery_output * 0.4), 0.0)
+    return grid, feed_in, autarky * 100, ev_from_batt
+
+
+def _validate(o: Dict[str, np.ndarray], inputs: Dict[str, np.ndarray], use_batt: bool, use_hp: bool,
+              pv_yield) -> Tuple[np.ndarray, np.ndarray]:
+    wallbox = inputs["wallbox"]
+    roof_max = np.maximum(0, np.floor(inputs["roofArea"] / 7))
+    daily_pv = (o["pv_kwp"] * pv_yield) / 365 * (np.asarray(pv_yield) != 0)
+    autarky = o["autarky_pct"]
+    be = o["break_even_years"]
+    expected_hp = HEATPUMP_EXTRA if use_hp else 0
+
+    issue_bits = [
+        o["pv_kwp"] > roof_max + 1e-6,
+        use_batt & (o["battery_kwh"] > daily_pv * 2 + 1e-6),
+        o["climate_block"] != np.where(inputs["climate"], CLIMATE_EXTRA, 0),
+        o["ev_block"] != np.where(wallbox, EV_KWH_PER_YEAR, 0),
+        o["heatpump_block"] != expected_hp,
+        wallbox & (o["co2_saving"] <= 0),
+        (autarky > 95) | (autarky < 3),
+        np.isnan(be) | (be <= 0),
+    ]
+    if not use_batt and not use_hp:
+        autarky_ranges = [(12, 50), None, None]
+    elif use_batt and not use_hp:
+        autarky_ranges = [None, (35, 85), None]
+    else:
+        autarky_ranges = [None, None, (45, 90)]
+    warning_bits = [
+        o["grid_import"] < MIN_GRID_IMPORT,
+        wallbox & (o["co2_saving"] > 0) & (o["co2_saving"] < EV_CO2_SAVING - 400),
+        *[
+            np.zeros(autarky.shape, dtype=bool) if rng is None else ~((rng[0] <= autarky) & (autarky <= rng[1]))
+            for rng in autarky_ranges
+        ],
+        be > 40,
+    ]
+
+    shape = autarky.shape
+    issues = np.zeros(shape, dtype=np.uint16)
+    for bit, mask in enumerate(issue_bits):
+        issues |= np.broadcast_to(mask, shape).astype(np.uint16) << bit
+    warnings = np.zeros(shape, dtype=np.uint16)
+    for bit, mask in enumerate(warning_bits):
+        warnings |= np.broadcast_to(mask, shape).astype(np.uint16) << bit
+    return issues, warnings
+
+
+def energy_stage(params: Dict, inputs: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Verbrauchsbloecke (household/heating/climate/ev) sowie Dimensionierung und Energiebilanz
+    je Szenario (ENERGY_COLUMNS, letzte Achse = Szenario).
+
+    Liest nur consumption.* und pv.yield_per_kwp; bei geaenderten ECONOMIC_PATHS kann das Ergebnis
+    an evaluate(..., energy=...) weitergereicht werden.
+    """
+    blocks = consumption_blocks(params, inputs)
+    pv_yield = params["pv.yield_per_kwp"]
+    per_scenario = []
+    for _, use_batt, use_hp in SCENARIOS:
+        hp_block = HEATPUMP_EXTRA if use_hp else 0
+        annual_consumption = blocks["household"] + blocks["climate"] + blocks["ev"] + hp_block
+
+        pv_kwp = recommend_pv_kwp(annual_consumption, inputs["roofArea"], inputs["houseType"])
+        if use_batt:
+            battery_kwh = recommend_battery_kwh(annual_consumption, pv_kwp, pv_yield)
+        else:
+            battery_kwh = np.zeros(np.shape(pv_kwp))
+
+        grid_import, feed_in, autarky_pct, ev_from_batt = estimate_energy_balance(
+            pv_kwp, battery_kwh, annual_consumption, pv_yield, inputs["wallbox"], blocks["ev"]
+        )
+        per_scenario.append(dict(zip(ENERGY_COLUMNS, (pv_kwp, battery_kwh, grid_import, feed_in, autarky_pct,
+                                                      ev_from_batt))))
+
+    stage = dict(blocks)
+    for name in ENERGY_COLUMNS:
+        stage[name] = np.stack(np.broadcast_arrays(*(o[name] for o in per_scenario)), axis=-1)
+    return stage
+
+
+def evaluate(params: Dict, inputs: Dict[str, np.ndarray], round_outputs: bool = True,
+             energy: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, np.ndarray]:
+    """Berechnet alle Szenarien fuer die Eingabespalten; liefert OUTPUT_COLUMNS plus Status/Flags.
+
+    round_outputs=False liefert die Kennzahlen ohne Anzeige-Rundung (z.B. fuer Elastizitaeten);
+    Status und Meldungen werden in beiden Faellen aus den gerundeten Werten bestimmt. `energy`
+    ist ein vorberechnetes energy_stage() fuer dieselben Eingaben und Verbrauchs-/Ertragsannahmen.
+    """
+    if energy is None:
+        energy = energy_stage(params, inputs)
+    blocks = {name: energy[name] for name in ("household", "heating", "climate", "ev")}
+    el_price = params["prices.electricity_eur_per_kwh"]
+    gas_price = params["prices.gas_eur_per_kwh"]
+    feed_in_tariff = params["prices.feed_in_eur_per_kwh"]
+    pv_yield = params["pv.yield_per_kwp"]
+    el_factor = params["co2.electricity_factor"]
+    gas_factor = params["co2.gas_factor"]
+    wallbox = inputs["wallbox"]
+
+    baseline_cost = (blocks["household"] * el_price + blocks["heating"] * gas_price
+                     + np.where(wallbox, float(COMBUSTION_FUEL_COST), 0.0))
+    co2_today = (blocks["household"] * el_factor + blocks["heating"] * gas_factor
+                 + np.where(wallbox, float(COMBUSTION_CO2), 0.0))
+    hp_cost = HEATPUMP_EXTRA / params["heatpump.full_load_hours"] * params["heatpump.cost_per_kw"]
+
+    per_scenario = []
+    for s, (_, use_batt, use_hp) in enumerate(SCENARIOS):
+        hp_block = HEATPUMP_EXTRA if use_hp else 0
+        heating_demand = 0 if use_hp else blocks["heating"]
+        pv_kwp, battery_kwh, grid_import, feed_in, autarky_pct, ev_from_batt = (
+            energy[name][..., s] for name in ENERGY_COLUMNS
+        )
+
+        pv_generation = pv_kwp * pv_yield
+        total_cost = (pv_kwp * params["pv.cost_per_kwp"] + battery_kwh * params["battery.cost_per_kwh"]
+                      + (hp_cost if use_hp else 0))
+        post_cost = grid_import * el_price - feed_in * feed_in_tariff + heating_demand * gas_price
+        savings = baseline_cost - post_cost
+        with np.errstate(divide="ignore", invalid="ignore"):
+            break_even = np.where(savings > 0, total_cost / savings, np.nan)
+        break_even = np.where(break_even == 0, np.nan, break_even)
+
+        ev_grid_share = np.where(wallbox, np.minimum(blocks["ev"], grid_import), 0.0)
+        other_grid = grid_import - ev_grid_share
+        co2_after = other_grid * el_factor + ev_grid_share * EV_CO2_MIX + heating_demand * gas_factor
+
+        raw = {
+            "pv_kwp": pv_kwp,
+            "battery_kwh": battery_kwh,
+            "grid_import": grid_import,
+            "feed_in": feed_in,
+            "autarky_pct": autarky_pct,
+            "pv_generation": pv_generation,
+            "co2_today": co2_today,
+            "co2_after": co2_after,
+            "co2_saving": co2_today - co2_after,
+            "break_even_years": break_even,
+            "annual_cost_post": post_cost,
+            "total_cost": total_cost,
+            "household_block": blocks["household"],
+            "climate_block": blocks["climate"],
+            "ev_block": blocks["ev"],
+            "heatpump_block": np.full(np.shape(blocks["ev"]), float(hp_block)),
+            "heating_demand": blocks["heating"],
+            "ev_from_batt": ev_from_batt,
+        }
+        shown = OUTPUT_DIGITS if round_outputs else VALIDATED_COLUMNS
+        o = {**raw, **{name: round_like_core(raw[name], OUTPUT_DIGITS[name]) for name in shown}}
+        flags = _validate(o, inputs, use_batt, use_hp, pv_yield)
+        if not round_outputs:
+            o = {name: np.asarray(values, dtype=float) for name, values in raw.items()}
+        o["issue_flags"], o["warning_flags"] = flags
+        per_scenario.append(o)
+
+    result = {}
+    for name in [*OUTPUT_COLUMNS, "issue_flags", "warning_flags"]:
+        arrays = np.broadcast_arrays(*(o[name] for o in per_scenario))
+        result[name] = np.stack(arrays, axis=-1)
+    shape = np.broadcast_shapes(*(a.shape for a in result.values()))
+    result = {name: np.broadcast_to(a, shape) for name, a in result.items()}
+    result["status"] = np.where(result["issue_flags"] > 0, 2, np.where(result["warning_flags"] > 0, 1, 0)).astype(np.int8)
+    return result
+
+
+def evaluate_range(data: Dict, start: int, stop: int,
+                   axes: List[Tuple[str, List]] = INPUT_AXES) -> Dict[str, np.ndarray]:
+    return evaluate(engine_params(data), decode_inputs(start, stop, axes))
+
+
+def _canonical_messages(messages: List[str], known: List[str]) -> List[str]:
+    """Skalar-Meldungen ohne variable Zusaetze (z.B. "(7.5 kWp > 6)") auf die Bit-Texte abbilden."""
+    return sorted(next((text for text in known if msg.startswith(text)), msg) for msg in messages)
+
+
+def _scaled_data(data: Dict, rng: random.Random, spread: float) -> Dict:
+    """Kopie von data.json mit allen PARAM_PATHS um einen Zufallsfaktor in [1-spread, 1+spread] verschoben."""
+    variant = copy.deepcopy(data)
+    for path in PARAM_PATHS:
+        *parents, leaf = path.split(".")
+        node = variant
+        for key in parents:
+            node = node[key]
+        node[leaf] = float(node[leaf]) * rng.uniform(1 - spread, 1 + spread)
+    return variant
+
+
+def self_check(data: Dict, axes: List[Tuple[str, List]] = INPUT_AXES, variants: int = 4, seed: int = 0,
+               spread: float = 0.3, show: int = 10) -> int:
+    """Vergleicht evaluate mit scenario_calculations fuer alle Zeilen von `axes`: data.json selbst und
+    `variants` zufaellig verschobene Annahmen. Gibt bis zu `show` Abweichungen aus, liefert deren Anzahl."""
+    rng = random.Random(seed)
+    n = matrix_size(axes)
+    failures = 0
+    for k in range(variants + 1):
+        variant = data if k == 0 else _scaled_data(data, rng, spread)
+        batch = evaluate(engine_params(variant), decode_inputs(0, n, axes))
+        for row in range(n):
+            inp = inputs_at(row, axes)
+            for s, res in enumerate(scenario_calculations(variant, inp)):
+                problems = []
+                for name in OUTPUT_COLUMNS:
+                    expected, got = res.outputs[name], float(batch[name][row, s])
+                    same = math.isnan(got) if expected is None else math.isclose(expected, got, rel_tol=1e-9, abs_tol=1e-9)
+                    if not same:
+                        problems.append(f"{name} {expected} != {got}")
+                if STATUS_LABELS[batch["status"][row, s]] != result_status(res):
+                    problems.append(f"status {result_status(res)} != {STATUS_LABELS[batch['status'][row, s]]}")
+                for label, flags, messages, expected in (
+                    ("issues", batch["issue_flags"][row, s], ISSUE_MESSAGES, res.issues),
+                    ("warnings", batch["warning_flags"][row, s], WARNING_MESSAGES, res.warnings),
+                ):
+                    if sorted(flags_to_messages(flags, messages)) != _canonical_messages(expected, messages):
+                        problems.append(f"{label} {expected} != {flags_to_messages(flags, messages)}")
+                if problems:
+                    failures += 1
+                    if failures <= show:
+                        print(f"[WARN] Variante {k}, Zeile {row}, {res.scenario}: {'; '.join(problems)}")
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Vektorisierten Rechenkern gegen modernisierung_core pruefen")
+    parser.add_argument("--self-check", action="store_true",
+                        help="Alle Matrixzeilen mit scenario_calculations vergleichen und beenden")
+    parser.add_argument("--axes", type=Path, help="Achsen-JSON (Standard: INPUT_AXES)")
+    parser.add_argument("--variants", type=int, default=4, help="Zusaetzliche Annahmen-Varianten (±30 %%)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if not args.self_check:
+        parser.print_help()
+        return
+    axes = load_axes(args.axes) if args.axes else INPUT_AXES
+    failures = self_check(load_data(), axes, args.variants, args.seed)
+    results = matrix_size(axes) * len(SCENARIOS) * (args.variants + 1)
+    print(f"[DONE] evaluate stimmt mit scenario_calculations ueberein ({results} Ergebnisse)" if not failures
+          else f"[WARN] {failures} von {results} Ergebnissen weichen ab")
+    raise SystemExit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
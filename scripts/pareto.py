@@ -0,0 +1,339 @@
+"""
+Pareto-Front (nicht dominierte Szenarien) je Haushaltsgruppe ueber frei waehlbare Zielgroessen.
+
+Statt paarweiser O(n²)-Vergleiche:
+- 2 Ziele: Sort-and-Sweep ueber alle Gruppen gleichzeitig (O(n log n))
+- 3 Ziele: Sweep in lexikographischer Reihenfolge mit Fenwick-Baum (O(n log n) je Gruppe)
+- >= 4 Ziele: Sort-Filter-Skyline; Kandidaten werden nach einem streng monotonen Score sortiert
+  und blockweise nur gegen die bisherige Front geprueft. Viele kleine Gruppen (z.B. 3 Szenarien
+  je Haushalt) werden gepolstert in einem Durchgang verglichen.
+
+Aufruf:
+    python scripts/pareto.py --xlsx scripts/test/modernisierung_tests.xlsx
+    python scripts/pareto.py --store out/matrix --objectives total_cost:min autarky_pct:max --group-by houseType area
+    python scripts/pareto.py --self-check
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from modernisierung_core import INPUT_AXES, SCENARIOS, axes_shape
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from matrix_store import MatrixStore
+
+DEFAULT_OBJECTIVES: Dict[str, str] = {
+    "total_cost": "min",
+    "co2_saving": "max",
+    "autarky_pct": "max",
+    "annual_cost_post": "min",
+}
+HOUSEHOLD_COLUMNS: List[str] = [name for name, _ in INPUT_AXES]
+
+SMALL_GROUP = 16  # bis zu dieser Gruppengroesse gepolsterter Paarvergleich
+SFS_BLOCK = 256
+PAD_CHUNK = 50_000
+
+
+def _oriented(values: np.ndarray, senses: Sequence[str]) -> np.ndarray:
+    """Alle Ziele als Minimierung; NaN (z.B. fehlender Break-even) gilt als schlechtester Wert."""
+    v = np.array(values, dtype=float, copy=True)
+    for j, sense in enumerate(senses):
+        if sense not in ("min", "max"):
+            raise ValueError(f"Richtung muss 'min' oder 'max' sein, nicht {sense!r}")
+        if sense == "max":
+            v[:, j] = -v[:, j]
+    v[np.isnan(v)] = np.inf
+    return v
+
+
+def _dominated_by(front: np.ndarray, points: np.ndarray) -> np.ndarray:
+    """Maske: welche `points` von mindestens einem Punkt in `front` dominiert werden."""
+    le = np.all(front[None, :, :] <= points[:, None, :], axis=2)
+    lt = np.any(front[None, :, :] < points[:, None, :], axis=2)
+    return np.any(le & lt, axis=1)
+
+
+def _sweep_2d(v: np.ndarray, group: np.ndarray) -> np.ndarray:
+    order = np.lexsort((v[:, 1], v[:, 0], group))
+    a, b, g = v[order, 0], v[order, 1], group[order]
+    b_rank = np.unique(b, return_inverse=True)[1].reshape(-1)
+    g_rank = np.unique(g, return_inverse=True)[1].reshape(-1)
+    # Jede neue Gruppe liegt komplett unter allen vorherigen -> laufendes Minimum startet je Gruppe neu
+    key = b_rank - g_rank * (int(b_rank.max()) + 1)
+    run_min = np.minimum.accumulate(key)
+    prev_min = np.concatenate(([np.iinfo(np.int64).max], run_min[:-1]))
+    new_min = key < prev_min
+    # Erster Punkt, der das aktuelle Minimum erreicht (kleinstes a bei gleichem b)
+    first = np.maximum.accumulate(np.where(new_min, np.arange(len(key)), 0))
+    dominated = (prev_min < key) | ((prev_min == key) & ~new_min & (a[first] < a))
+    mask = np.empty(len(v), dtype=bool)
+    mask[order] = ~dominated
+    return mask
+
+
+def _sweep_3d(v: np.ndarray) -> np.ndarray:
+    """3 Ziele fuer eine Gruppe in O(n log n): lexikographisch sortieren, Fenwick-Baum mit Praefix-Minimum.
+
+    Nach dem Entfernen von Duplikaten geht jeder Dominator seinem Punkt in lexikographischer Reihenfolge
+    voraus; dominiert ist ein Punkt also genau dann, wenn ein frueherer mit y <= y_j auch z <= z_j hat.
+    """
+    uniq, inverse = np.unique(v, axis=0, return_inverse=True)
+    y_rank = np.unique(uniq[:, 1], return_inverse=True)[1].reshape(-1) + 1
+    z_rank = np.unique(uniq[:, 2], return_inverse=True)[1].reshape(-1)
+    size = int(y_rank.max())
+    # Raenge statt Werte: der leere Praefix liegt ueber jedem echten z, auch ueber inf (= fehlender Wert)
+    empty = int(z_rank.max()) + 1
+    tree = [empty] * (size + 1)
+    dominated = np.zeros(len(uniq), dtype=bool)
+    for j, (r, z) in enumerate(zip(y_rank.tolist(), z_rank.tolist())):
+        i, best = r, empty
+        while i > 0:
+            best = min(best, tree[i])
+            i -= i & -i
+        if best <= z:
+            # Dominierte Punkte nicht einfuegen: ihr Dominator deckt alles ab, was sie dominieren wuerden
+            dominated[j] = True
+            continue
+        i = r
+        while i <= size:
+            if z < tree[i]:
+                tree[i] = z
+            i += i & -i
+    return ~dominated[inverse.reshape(-1)]
+
+
+def _sfs(v: np.ndarray) -> np.ndarray:
+    """Sort-Filter-Skyline fuer eine Gruppe: ein Dominator hat stets einen kleineren Rang-Score."""
+    ranks = np.column_stack([np.unique(col, return_inverse=True)[1].reshape(-1) for col in v.T])
+    order = np.lexsort((*v.T[::-1], ranks.sum(axis=1)))
+    keep = np.zeros(len(v), dtype=bool)
+    front = np.empty((0, v.shape[1]))
+    for lo in range(0, len(order), SFS_BLOCK):
+        idx = order[lo:lo + SFS_BLOCK]
+        block = v[idx]
+        # Erst gegen die fruehesten (staerksten) Front-Punkte filtern, die meisten Kandidaten fallen dort raus
+        for part in (front[:SFS_BLOCK], front[SFS_BLOCK:]):
+            if len(part) and len(block):
+                alive = ~_dominated_by(part, block)
+                idx, block = idx[alive], block[alive]
+        alive = ~_dominated_by(block, block)
+        keep[idx[alive]] = True
+        front = np.vstack([front, block[alive]])
+    return keep
+
+
+def _padded_pairwise(v: np.ndarray, group: np.ndarray) -> np.ndarray:
+    """Viele kleine Gruppen: in (Gruppen x max. Groesse x Ziele) polstern und je Gruppe vergleichen."""
+    order = np.argsort(group, kind="stable")
+    g = group[order]
+    starts = np.flatnonzero(np.concatenate(([True], g[1:] != g[:-1])))
+    sizes = np.diff(np.append(starts, len(g)))
+    slot = np.arange(len(g)) - np.repeat(starts, sizes)
+    gid = np.repeat(np.arange(len(starts)), sizes)
+    width = int(sizes.max())
+
+    padded = np.full((len(starts), width, v.shape[1]), np.inf)
+    padded[gid, slot] = v[order]
+    dominated = np.zeros((len(starts), width), dtype=bool)
+    for lo in range(0, len(starts), PAD_CHUNK):
+        p = padded[lo:lo + PAD_CHUNK]
+        le = np.all(p[:, :, None, :] <= p[:, None, :, :], axis=3)
+        lt = np.any(p[:, :, None, :] < p[:, None, :, :], axis=3)
+        dominated[lo:lo + PAD_CHUNK] = np.any(le & lt, axis=1)
+    mask = np.empty(len(v), dtype=bool)
+    mask[order] = ~dominated[gid, slot]
+    return mask
+
+
+def pareto_mask(values: np.ndarray, senses: Sequence[str], group: Optional[np.ndarray] = None) -> np.ndarray:
+    """True fuer nicht dominierte Zeilen (je Gruppe). values: (n, k), senses: 'min'/'max' je Spalte."""
+    v = _oriented(values, senses)
+    if len(v) == 0:
+        return np.zeros(0, dtype=bool)
+    group = np.zeros(len(v), dtype=np.int64) if group is None else np.asarray(group)
+    if v.shape[1] == 1:
+        v = np.column_stack([v[:, 0], np.zeros(len(v))])
+    if v.shape[1] == 2:
+        return _sweep_2d(v, group)
+
+    codes = np.unique(group, return_inverse=True)[1].reshape(-1)
+    sizes = np.bincount(codes)
+    mask = np.zeros(len(v), dtype=bool)
+    small = sizes[codes] <= SMALL_GROUP
+    if small.any():
+        mask[small] = _padded_pairwise(v[small], codes[small])
+    large_group = _sweep_3d if v.shape[1] == 3 else _sfs
+    for code in np.flatnonzero(sizes > SMALL_GROUP):
+        rows = np.flatnonzero(codes == code)
+        mask[rows] = large_group(v[rows])
+    return mask
+
+
+def brute_force_mask(values: np.ndarray, senses: Sequence[str], group: Optional[np.ndarray] = None) -> np.ndarray:
+    """Referenz fuer pareto_mask: jeder Punkt gegen jeden seiner Gruppe (O(n²), nur zum Pruefen)."""
+    v = _oriented(values, senses)
+    group = np.zeros(len(v), dtype=np.int64) if group is None else np.asarray(group)
+    mask = np.zeros(len(v), dtype=bool)
+    for code in np.unique(group):
+        rows = np.flatnonzero(group == code)
+        mask[rows] = ~_dominated_by(v[rows], v[rows])
+    return mask
+
+
+def self_check(trials: int = 300, seed: int = 0) -> int:
+    """Zufallsvergleich pareto_mask vs. brute_force_mask fuer 1–5 Ziele mit NaN, Gleichstaenden und
+    Gruppen unter/ueber SMALL_GROUP (alle Pfade: 2D-Sweep, Fenwick, SFS, gepolstert). Liefert die Fehlerzahl."""
+    rng = np.random.default_rng(seed)
+    failures = 0
+    for t in range(trials):
+        k = 1 + t % 5
+        n = int(rng.integers(1, 300))
+        values = rng.integers(0, 6, size=(n, k)).astype(float)
+        values[rng.random((n, k)) < 0.1] = np.nan
+        values[rng.random((n, k)) < 0.02] = np.inf
+        group = rng.integers(0, int(rng.integers(1, 8)), size=n)
+        senses = [str(sense) for sense in rng.choice(["min", "max"], size=k)]
+        expected = brute_force_mask(values, senses, group)
+        got = pareto_mask(values, senses, group)
+        if not np.array_equal(got, expected):
+            failures += 1
+            print(f"[WARN] Abweichung: k={k}, n={n}, {int((got != expected).sum())} Zeilen")
+    return failures
+
+
+def pareto_front(df: pd.DataFrame, objectives: Optional[Dict[str, str]] = None,
+                 group_by: Optional[List[str]] = None) -> pd.DataFrame:
+    """Zeilen von `df`, die innerhalb ihrer Gruppe bzgl. `objectives` nicht dominiert sind."""
+    objectives = objectives or DEFAULT_OBJECTIVES
+    group_by = [c for c in HOUSEHOLD_COLUMNS if c in df.columns] if group_by is None else group_by
+    group = df.groupby(group_by, sort=False).ngroup().to_numpy() if group_by else None
+    mask = pareto_mask(df[list(objectives)].to_numpy(dtype=float), list(objectives.values()), group)
+    return df[mask]
+
+
+def _block_mask(store: MatrixStore, lo: int, hi: int, objectives: Dict[str, str], group_by: List[str],
+                exclude_errors: bool) -> Tuple[int, np.ndarray]:
+    """Front-Maske (Zeilen x Szenarien) fuer die flachen Positionen [lo, hi); liest nur Ziel- und Statusspalte."""
+    from modernisierung_batch import STATUS_LABELS
+
+    rows = slice(lo - store.start, hi - store.start)
+    n_scen = len(SCENARIOS)
+    values = np.column_stack([np.asarray(store.column(name)[rows], dtype=float).reshape(-1) for name in objectives])
+    names = [name for name, _ in store.axes]
+    group = np.zeros(hi - lo, dtype=np.int64)
+    if group_by:
+        positions = np.unravel_index(np.arange(lo, hi, dtype=np.int64), axes_shape(store.axes))
+        group = np.ravel_multi_index([positions[names.index(c)] for c in group_by],
+                                     [len(store.axes[names.index(c)][1]) for c in group_by])
+    group = np.repeat(group, n_scen)
+
+    keep = np.ones(len(values), dtype=bool)
+    if exclude_errors:
+        keep = np.asarray(store.column("status")[rows]).reshape(-1) != STATUS_LABELS.index("error")
+    mask = np.zeros(len(values), dtype=bool)
+    mask[keep] = pareto_mask(values[keep], list(objectives.values()), group[keep])
+    return int(keep.sum()), mask.reshape(-1, n_scen)
+
+
+def _front_frame(store: MatrixStore, lo: int, mask: np.ndarray) -> pd.DataFrame:
+    """DataFrame (inkl. Meldungstexte) nur fuer Store-Zeilen ab `lo` mit mindestens einem Front-Szenario."""
+    from matrix_store import result_frame
+    from modernisierung_batch import decode_inputs
+
+    rows = slice(lo - store.start, lo - store.start + len(mask))
+    hit = np.flatnonzero(mask.any(axis=1))
+    inputs = {name: values[hit] for name, values in decode_inputs(lo, lo + len(mask), store.axes).items()}
+    frame = result_frame(inputs, {name: np.asarray(store.column(name)[rows])[hit] for name in store.columns})
+    return frame[mask[hit].reshape(-1)]
+
+
+def store_front(store: MatrixStore, objectives: Optional[Dict[str, str]] = None, group_by: Optional[List[str]] = None,
+                exclude_errors: bool = False, chunk_size: int = 200_000) -> Iterator[Tuple[int, pd.DataFrame]]:
+    """Front eines Memory-Mapped Stores blockweise als (betrachtete Zeilen, Front-Ausschnitt).
+
+    Bilden die Gruppierungsspalten einen Praefix der Store-Achsen (Standard: alle Eingaben, eine Gruppe je
+    Store-Zeile), liegen Gruppen zusammenhaengend und die Bloecke werden an Gruppengrenzen geschnitten.
+    Andere Gruppierungen brauchen die Zielspalten aller Zeilen zugleich; die Ausgabe bleibt blockweise.
+    """
+    objectives = objectives or DEFAULT_OBJECTIVES
+    names = [name for name, _ in store.axes]
+    group_by = names if group_by is None else list(group_by)
+    unknown = [c for c in group_by if c not in names]
+    if unknown:
+        raise ValueError(f"Gruppierung im Store nur nach Eingabe-Achsen moeglich, nicht nach {', '.join(unknown)}")
+    if set(group_by) == set(names[:len(group_by)]):
+        group_rows = int(np.prod(axes_shape(store.axes)[len(group_by):], dtype=np.int64))
+        step = max(1, chunk_size // group_rows) * group_rows
+        bounds = [store.start, *range((store.start // step + 1) * step, store.stop, step), store.stop]
+    else:
+        bounds = [store.start, store.stop]
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        considered, mask = _block_mask(store, lo, hi, objectives, group_by, exclude_errors)
+        for part in range(0, hi - lo, chunk_size):
+            if part == 0 or mask[part:part + chunk_size].any():
+                yield considered if part == 0 else 0, _front_frame(store, lo + part, mask[part:part + chunk_size])
+
+
+def _parse_objective(raw: str) -> tuple:
+    name, _, sense = raw.partition(":")
+    return name, sense or DEFAULT_OBJECTIVES.get(name, "min")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pareto-Front je Haushaltsgruppe bestimmen")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--xlsx", type=Path, default=Path(__file__).resolve().parent / "test" / "modernisierung_tests.xlsx")
+    source.add_argument("--store", type=Path, help="Memory-Mapped Store (matrix_store)")
+    parser.add_argument("--objectives", nargs="+", metavar="SPALTE[:min|max]",
+                        help="Zielgroessen (Standard: total_cost:min co2_saving:max autarky_pct:max annual_cost_post:min)")
+    parser.add_argument("--group-by", nargs="*", help="Gruppierungsspalten (Standard: alle Haushalts-Eingaben)")
+    parser.add_argument("--exclude-errors", action="store_true", help="Zeilen mit status=error vorher verwerfen")
+    parser.add_argument("--output", type=Path, help="Front als CSV schreiben")
+    parser.add_argument("--chunk-size", type=int, default=200_000, help="Store-Zeilen je Block (nur --store)")
+    parser.add_argument("--self-check", action="store_true",
+                        help="pareto_mask gegen den Paarvergleich pruefen (Zufallsdaten mit NaN) und beenden")
+    args = parser.parse_args()
+
+    if args.self_check:
+        failures = self_check()
+        print("[DONE] pareto_mask stimmt mit dem Paarvergleich ueberein" if not failures
+              else f"[WARN] {failures} Abweichungen")
+        raise SystemExit(1 if failures else 0)
+
+    import pandas as pd
+
+    objectives = dict(_parse_objective(o) for o in args.objectives) if args.objectives else DEFAULT_OBJECTIVES
+    if args.store:
+        from matrix_store import MatrixStore
+
+        blocks = store_front(MatrixStore(args.store), objectives, args.group_by, args.exclude_errors,
+                             args.chunk_size)
+    else:
+        df = pd.read_excel(args.xlsx, sheet_name="Testmatrix")
+        if args.exclude_errors:
+            df = df[df["status"] != "error"]
+        blocks = iter([(len(df), pareto_front(df, objectives, args.group_by))])
+
+    total, size, counts = 0, 0, pd.Series(dtype=np.int64)
+    for k, (considered, front) in enumerate(blocks):
+        total += considered
+        size += len(front)
+        counts = counts.add(front["scenario"].value_counts(), fill_value=0)
+        if args.output:
+            front.to_csv(args.output, index=False, mode="w" if k == 0 else "a", header=k == 0)
+    print(f"Pareto-Front: {size} von {total} Zeilen nicht dominiert "
+          f"({', '.join(f'{k}:{v}' for k, v in objectives.items())})")
+    print(counts.astype(np.int64).sort_values(ascending=False).to_string())
+    if args.output:
+        print(f"Geschrieben: {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Testmatrix je Bundesland: regionaler PV-Ertrag und verfuegbare Landesfoerderungen.
+
+Der Bundesland-Faktor skaliert pv.yield_per_kwp. Statt die Matrix 16-fach in Python zu
+wiederholen, wird der Ertrag als Spalte (Laender, 1) an den Rechenkern gegeben; alle vom
+Ertrag unabhaengigen Zwischenergebnisse (Verbrauchsbloecke, PV-Dimensionierung) bleiben
+(n,) und werden nur gebroadcastet. Ergebnisse haben die Form (Laender, n, Szenarien).
+
+subsidies.json wird einmal zu einer Zaehl-Tabelle (Laender x Massnahmen) verdichtet und
+ebenfalls per Broadcasting an die Zeilen gehaengt. Die Zeilenreihenfolge entspricht dem
+Achsen-Produkt mit "bundesland" als erster Achse.
+
+Aufruf:
+    python scripts/regional.py
+    python scripts/regional.py --states BY NI SH --output regional.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from modernisierung_batch import decode_inputs, engine_params, evaluate
+from modernisierung_core import INPUT_AXES, SCENARIOS, load_data, matrix_size
+from subsidy_catalog import BUNDESLAENDER, MEASURES, SUBSIDY_PATH
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Mittlerer spezifischer Ertrag je Land relativ zum Bundeswert in data.json (950 kWh/kWp);
+# data.json kann die Faktoren unter regional.pv_yield_factor ueberschreiben
+PV_YIELD_FACTORS: Dict[str, float] = {
+    "BW": 1.05, "BY": 1.07, "BE": 0.97, "BB": 0.99, "HB": 0.93, "HH": 0.92, "HE": 1.00, "MV": 0.98,
+    "NI": 0.94, "NW": 0.94, "RP": 1.01, "SL": 1.02, "SN": 1.00, "ST": 0.98, "SH": 0.93, "TH": 1.00,
+}
+
+# Welche Foerdermassnahmen ein Szenario betrifft (PV immer, Speicher/WP je nach Szenario)
+SCENARIO_MEASURES: List[Tuple[str, ...]] = [
+    ("pv", *(("battery",) if use_batt else ()), *(("heatpump",) if use_hp else ()))
+    for _, use_batt, use_hp in SCENARIOS
+]
+SUBSIDY_COLUMNS: List[str] = [f"subsidies_{measure}" for measure in MEASURES] + ["subsidies_scenario"]
+
+
+def yield_factors(data: Dict, states: List[str]) -> np.ndarray:
+    overrides = data.get("regional", {}).get("pv_yield_factor", {})
+    return np.array([float(overrides.get(state, PV_YIELD_FACTORS[state])) for state in states])
+
+
+def subsidy_table(subsidies: Dict, states: List[str]) -> np.ndarray:
+    """Anzahl Programme je (Land, Massnahme) – einmalig aus subsidies.json verdichtet."""
+    table = np.zeros((len(states), len(MEASURES)), dtype=np.int16)
+    for i, state in enumerate(states):
+        programs = subsidies.get(state, {})
+        for j, measure in enumerate(MEASURES):
+            table[i, j] = len(programs.get(measure) or [])
+    return table
+
+
+def scenario_relevance() -> np.ndarray:
+    """(Szenarien, Massnahmen) bool."""
+    return np.array([[measure in measures for measure in MEASURES] for measures in SCENARIO_MEASURES])
+
+
+def evaluate_states(params: Dict, inputs: Dict[str, np.ndarray], factors: np.ndarray,
+                    table: np.ndarray) -> Dict[str, np.ndarray]:
+    """Alle Laender in einem Aufruf; Ergebnisspalten (Laender, n, Szenarien)."""
+    regional = dict(params)
+    regional["pv.yield_per_kwp"] = params["pv.yield_per_kwp"] * factors[:, None]
+    result = evaluate(regional, inputs)
+    shape = (len(factors), len(inputs["houseType"]), len(SCENARIOS))
+    result = {name: np.broadcast_to(values, shape) for name, values in result.items()}
+
+    for j, measure in enumerate(MEASURES):
+        result[f"subsidies_{measure}"] = np.broadcast_to(table[:, j, None, None], shape)
+    per_scenario = table.astype(np.int32) @ scenario_relevance().T.astype(np.int32)  # (Laender, Szenarien)
+    result["subsidies_scenario"] = np.broadcast_to(per_scenario[:, None, :], shape)
+    return result
+
+
+def regional_frame(states: List[str], inputs: Dict[str, np.ndarray], result: Dict[str, np.ndarray]) -> pd.DataFrame:
+    from matrix_store import result_frame
+
+    n = len(inputs["houseType"])
+    flat_inputs = {"bundesland": np.repeat(np.asarray(states, dtype=object), n)}
+    flat_inputs.update({name: np.tile(values, len(states)) for name, values in inputs.items()})
+    columns = {name: np.reshape(values, (len(states) * n, len(SCENARIOS))) for name, values in result.items()}
+    return result_frame(flat_inputs, columns)
+
+
+def run_regional(data: Dict, subsidies: Dict, states: Optional[List[str]] = None,
+                 axes: List[Tuple[str, List]] = INPUT_AXES, chunk_size: int = 100_000) -> pd.DataFrame:
+    import pandas as pd
+
+    states = states or BUNDESLAENDER
+    params = engine_params(data)
+    factors = yield_factors(data, states)
+    table = subsidy_table(subsidies, states)
+    total = matrix_size(axes)
+    frames = []
+    for lo in range(0, total, chunk_size):
+        inputs = decode_inputs(lo, min(total, lo + chunk_size), axes)
+        frames.append(regional_frame(states, inputs, evaluate_states(params, inputs, factors, table)))
+    frame = pd.concat(frames, ignore_index=True)
+    if len(frames) > 1:
+        # Bundesland als erste Achse: Bloecke wieder nach Land ordnen
+        frame = frame.iloc[np.argsort(pd.Categorical(frame["bundesland"], states).codes, kind="stable")]
+    return frame.reset_index(drop=True)
+
+
+def print_summary(frame: pd.DataFrame) -> None:
+    grouped = frame.groupby(["bundesland", "scenario"], sort=False)
+    summary = grouped.agg(
+        pv_generation=("pv_generation", "mean"),
+        autarky_pct=("autarky_pct", "mean"),
+        break_even=("break_even_years", "median"),
+        warning=("status", lambda s: int((s == "warning").sum())),
+        error=("status", lambda s: int((s == "error").sum())),
+        programs=("subsidies_scenario", "first"),
+    )
+    print(summary.round(1).to_string())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Testmatrix je Bundesland (PV-Ertrag, Landesfoerderungen)")
+    parser.add_argument("--states", nargs="+", choices=BUNDESLAENDER, metavar="LAND",
+                        help="Nur diese Laender (Kuerzel wie in subsidies.json)")
+    parser.add_argument("--axes", type=Path, help="Achsen-JSON (Standard: INPUT_AXES)")
+    parser.add_argument("--subsidies", type=Path, default=SUBSIDY_PATH)
+    parser.add_argument("--output", type=Path, help="Ergebnisse als CSV")
+    args = parser.parse_args()
+
+    from modernisierung_core import load_axes
+
+    axes = load_axes(args.axes) if args.axes else INPUT_AXES
+    subsidies = json.loads(args.subsidies.read_text(encoding="utf-8"))
+    frame = run_regional(load_data(), subsidies, args.states, axes)
+    print_summary(frame)
+    if args.output:
+        frame.to_csv(args.output, index=False)
+        print(f"Geschrieben: {args.output} ({len(frame)} Zeilen)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""
+One-at-a-time-Sensitivitaet (Tornado) der Testmatrix gegenueber den Annahmen in data.json.
+
+Jedes numerische Blatt von data.json wird um ±x % verschoben. Alle Verschiebungen laufen in
+hoechstens zwei Aufrufen des vektorisierten Rechenkerns: die betroffenen Zeilen aller Varianten
+werden hintereinander gehaengt und die Annahmen als Spalten je Zeile uebergeben. Zeilen, die eine
+Annahme nicht beeinflussen kann (z.B. heating_per_sqm.reihenhaus.gut fuer Doppelhaeuser),
+und Blaetter, die der Rechenkern gar nicht liest, uebernehmen das Basisergebnis ohne Rechnung.
+Preise, Kosten und CO2-Faktoren (ECONOMIC_PATHS) aendern weder Verbrauch noch Dimensionierung
+oder Energiebilanz; fuer sie wird nur die Kosten-/CO2-Stufe auf der einmal berechneten
+Basis-Energiebilanz (energy_stage) neu gerechnet.
+
+Elastizitaet je Zeile, Szenario und Kennzahl: (y+ - y-) / (2 * x * y0), gerechnet auf den
+ungerundeten Kennzahlen (Statuswechsel wie im Rechenkern auf den gerundeten).
+
+Aufruf:
+    python scripts/sensitivity.py --delta 10 --group-by houseType
+    python scripts/sensitivity.py --paths pv.cost_per_kwp prices.feed_in_eur_per_kwh --rows-output elastizitaeten.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from modernisierung_batch import (
+    ECONOMIC_PATHS,
+    HOUSE_KEYS,
+    PARAM_PATHS,
+    decode_inputs,
+    energy_stage,
+    engine_params,
+    evaluate,
+)
+from modernisierung_core import INPUT_AXES, SCENARIOS, load_data, matrix_size
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+DEFAULT_OUTPUTS: List[str] = ["break_even_years", "total_cost", "annual_cost_post", "co2_saving", "autarky_pct"]
+DEFAULT_CHUNK_ROWS = 20_000
+
+
+def numeric_leaves(data: Dict, prefix: str = "") -> List[str]:
+    """Punkt-Pfade aller numerischen Blaetter (ohne bool) in Dokumentreihenfolge."""
+    paths = []
+    for key, value in data.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            paths += numeric_leaves(value, path)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            paths.append(path)
+    return paths
+
+
+def affected_rows(path: str, inputs: Dict[str, np.ndarray]) -> np.ndarray:
+    """Zeilen, deren Ergebnis von der Annahme `path` abhaengen kann."""
+    n = len(inputs["houseType"])
+    if path not in PARAM_PATHS:
+        return np.zeros(n, dtype=bool)
+    if path.startswith("consumption.heating_per_sqm."):
+        house_key, ins = path.split(".")[2:]
+        houses = [house for house, key in HOUSE_KEYS.items() if key == house_key]
+        return np.isin(inputs["houseType"], houses) & (inputs["insulation"] == ins)
+    return np.ones(n, dtype=bool)
+
+
+def perturbed_results(params: Dict[str, float], inputs: Dict[str, np.ndarray], paths: List[str], delta: float,
+                      outputs: List[str]) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray], Dict[str, int]]:
+    """Basis (n, S) sowie Ergebnisse fuer -delta/+delta je Pfad, Form (2, P, n, S)."""
+    energy = energy_stage(params, inputs)
+    base = evaluate(params, inputs, round_outputs=False, energy=energy)
+    names = [*outputs, "status"]
+    n = len(inputs["houseType"])
+
+    segments = []  # (Richtung, Pfad-Index, Zeilen)
+    for p, path in enumerate(paths):
+        rows = np.flatnonzero(affected_rows(path, inputs))
+        if len(rows):
+            segments += [(d, p, rows) for d in (0, 1)]
+
+    perturbed = {name: np.broadcast_to(base[name], (2, len(paths), *base[name].shape)).copy() for name in names}
+    info = {"evaluated_rows": 0, "reused_energy_rows": 0, "matrix_rows": n}
+    # Preise, Kosten und CO2-Faktoren rechnen nur die Kosten-/CO2-Stufe auf der Basis-Energiebilanz neu
+    for economic in (False, True):
+        group = [seg for seg in segments if (paths[seg[1]] in ECONOMIC_PATHS) == economic]
+        if not group:
+            continue
+        rows = np.concatenate([seg[2] for seg in group])
+        batch_inputs = {name: col[rows] for name, col in inputs.items()}
+        batch_params: Dict[str, object] = dict(params)
+        pos = 0
+        for d, p, seg_rows in group:
+            path = paths[p]
+            if not isinstance(batch_params[path], np.ndarray):
+                batch_params[path] = np.full(len(rows), params[path])
+            batch_params[path][pos:pos + len(seg_rows)] = params[path] * (1 + (2 * d - 1) * delta)
+            pos += len(seg_rows)
+
+        batch_energy = {name: col[rows] for name, col in energy.items()} if economic else None
+        res = evaluate(batch_params, batch_inputs, round_outputs=False, energy=batch_energy)
+        direction = np.concatenate([np.full(len(seg[2]), seg[0]) for seg in group])
+        path_idx = np.concatenate([np.full(len(seg[2]), seg[1]) for seg in group])
+        for name in names:
+            perturbed[name][direction, path_idx, rows] = res[name]
+        info["evaluated_rows"] += len(rows)
+        if economic:
+            info["reused_energy_rows"] += len(rows)
+    return base, perturbed, info
+
+
+def elasticities(base: Dict[str, np.ndarray], perturbed: Dict[str, np.ndarray], delta: float,
+                 outputs: List[str]) -> Dict[str, np.ndarray]:
+    """Zentrale Elastizitaet je Pfad, Zeile und Szenario (P, n, S); NaN bei y0 = 0 oder fehlendem Wert."""
+    result = {}
+    for name in outputs:
+        y0 = base[name].astype(float)
+        lo, hi = perturbed[name].astype(float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            e = (hi - lo) / (2 * delta * y0)
+        result[name] = np.where(np.isfinite(e), e, np.nan)
+    return result
+
+
+def _long_frame(inputs: Dict[str, np.ndarray], paths: List[str], elast: Dict[str, np.ndarray],
+                base: Dict[str, np.ndarray], perturbed: Dict[str, np.ndarray], rank_by: str) -> pd.DataFrame:
+    """Eine Zeile je (Pfad, Matrixzeile, Szenario)."""
+    import pandas as pd
+
+    n_paths, n, n_scen = elast[next(iter(elast))].shape
+    path_idx, row, scen = (a.reshape(-1) for a in np.indices((n_paths, n, n_scen)))
+    df = pd.DataFrame({name: col[row] for name, col in inputs.items()})
+    df["scenario"] = np.asarray([label for label, _, _ in SCENARIOS], dtype=object)[scen]
+    df["parameter"] = np.asarray(paths, dtype=object)[path_idx]
+    for name, e in elast.items():
+        df[name] = e.reshape(-1)
+    df[f"{rank_by}_base"] = np.broadcast_to(base[rank_by], (n_paths, n, n_scen)).reshape(-1)
+    df[f"{rank_by}_low"] = perturbed[rank_by][0].reshape(-1)
+    df[f"{rank_by}_high"] = perturbed[rank_by][1].reshape(-1)
+    df["status_changed"] = ((perturbed["status"][0] != base["status"]) | (perturbed["status"][1] != base["status"])).reshape(-1)
+    return df
+
+
+def _partial_aggregate(df: pd.DataFrame, keys: List[str], outputs: List[str], rank_by: str) -> pd.DataFrame:
+    """Summen und Zaehler je Gruppe (mergebar ueber Zeilenbloecke)."""
+    import pandas as pd
+
+    parts = {}
+    for name in outputs:
+        finite = df[name].notna()
+        parts[f"{name}__sum"] = df[name].fillna(0.0)
+        parts[f"{name}__abs"] = df[name].abs().fillna(0.0)
+        parts[f"{name}__n"] = finite.astype(np.int64)
+    # Basis/tief/hoch nur ueber Zeilen mitteln, in denen alle drei Werte existieren
+    swing = df[[f"{rank_by}_{suffix}" for suffix in ("base", "low", "high")]].astype(float)
+    complete = swing.notna().all(axis=1)
+    for suffix, col in zip(("base", "low", "high"), swing.columns):
+        parts[f"{rank_by}_{suffix}__sum"] = swing[col].where(complete, 0.0)
+    parts[f"{rank_by}_swing__n"] = complete.astype(np.int64)
+    parts["status_changed__sum"] = df["status_changed"].astype(np.int64)
+    parts["rows__sum"] = np.ones(len(df), dtype=np.int64)
+    frame = pd.DataFrame(parts)
+    for key in keys:
+        frame[key] = df[key].to_numpy()
+    return frame.groupby(keys, sort=False).sum()
+
+
+def _finalize(acc: pd.DataFrame, outputs: List[str], rank_by: str) -> pd.DataFrame:
+    import pandas as pd
+
+    out = pd.DataFrame(index=acc.index)
+    out["rows"] = acc["rows__sum"]
+    for name in outputs:
+        count = acc[f"{name}__n"].where(acc[f"{name}__n"] > 0)
+        out[name] = acc[f"{name}__sum"] / count
+        out[f"{name}_abs"] = acc[f"{name}__abs"] / count
+    count = acc[f"{rank_by}_swing__n"].where(acc[f"{rank_by}_swing__n"] > 0)
+    for suffix in ("base", "low", "high"):
+        out[f"{rank_by}_{suffix}"] = acc[f"{rank_by}_{suffix}__sum"] / count
+    out["status_changed"] = acc["status_changed__sum"]
+    return out.reset_index()
+
+
+def run_sensitivity(data: Dict, paths: Optional[List[str]] = None, delta: float = 0.1,
+                    outputs: Optional[List[str]] = None, group_by: Optional[List[str]] = None,
+                    axes: List[Tuple[str, List]] = INPUT_AXES, rank_by: str = "break_even_years",
+                    chunk_rows: int = DEFAULT_CHUNK_ROWS, rows_output: Optional[Path] = None) -> Tuple[pd.DataFrame, Dict]:
+    """Aggregierte Elastizitaeten je Gruppe x Parameter; optional alle Zeilen als CSV."""
+    paths = paths or numeric_leaves(data)
+    outputs = list(outputs or DEFAULT_OUTPUTS)
+    if rank_by not in outputs:
+        outputs.append(rank_by)
+    keys = [*(group_by if group_by is not None else ["houseType"]), "scenario", "parameter"]
+    params = engine_params(data)
+
+    total = matrix_size(axes)
+    acc: Optional[pd.DataFrame] = None
+    stats = {"matrix_rows": 0, "evaluated_rows": 0, "reused_energy_rows": 0, "paths": len(paths),
+             "unused_paths": [p for p in paths if p not in PARAM_PATHS]}
+    header = True
+    for lo in range(0, total, chunk_rows):
+        inputs = decode_inputs(lo, min(total, lo + chunk_rows), axes)
+        base, perturbed, info = perturbed_results(params, inputs, paths, delta, outputs)
+        stats["matrix_rows"] += len(inputs["houseType"])
+        stats["evaluated_rows"] += info["evaluated_rows"]
+        stats["reused_energy_rows"] += info["reused_energy_rows"]
+        df = _long_frame(inputs, paths, elasticities(base, perturbed, delta, outputs), base, perturbed, rank_by)
+        if rows_output:
+            df.to_csv(rows_output, mode="w" if header else "a", header=header, index=False)
+            header = False
+        part = _partial_aggregate(df, keys, outputs, rank_by)
+        acc = part if acc is None else acc.add(part, fill_value=0)
+    return _finalize(acc, outputs, rank_by), stats
+
+
+def print_tornado(summary: pd.DataFrame, group_by: List[str], rank_by: str, top: int) -> None:
+    for group, rows in summary.groupby([*group_by, "scenario"], sort=False):
+        rows = rows[rows[f"{rank_by}_abs"] > 0].sort_values(f"{rank_by}_abs", ascending=False).head(top)
+        label = ", ".join(map(str, group))
+        print(f"\n=== TORNADO {rank_by}: {label} ===")
+        if rows.empty:
+            print("  keine Abhaengigkeit")
+            continue
+        for _, r in rows.iterrows():
+            print(f"  {r['parameter']:45s} E {r[rank_by]:+7.3f} |E| {r[f'{rank_by}_abs']:6.3f} "
+                  f"{r[f'{rank_by}_low']:9.2f} .. {r[f'{rank_by}_high']:9.2f} (Basis {r[f'{rank_by}_base']:9.2f})"
+                  f"  Statuswechsel {int(r['status_changed'])}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Tornado-Sensitivitaet der Testmatrix gegenueber data.json-Annahmen")
+    parser.add_argument("--delta", type=float, default=10.0, help="Verschiebung in Prozent (±)")
+    parser.add_argument("--paths", nargs="+", help="Nur diese data.json-Pfade (Standard: alle numerischen Blaetter)")
+    parser.add_argument("--outputs", nargs="+", default=DEFAULT_OUTPUTS, help="Kennzahlen")
+    parser.add_argument("--rank-by", default="break_even_years", help="Kennzahl fuer die Tornado-Sortierung")
+    parser.add_argument("--group-by", nargs="*", default=["houseType"], help="Gruppierung (zusaetzlich je Szenario)")
+    parser.add_argument("--axes", type=Path, help="Achsen-JSON (Standard: INPUT_AXES)")
+    parser.add_argument("--top", type=int, default=8, help="Balken je Gruppe")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--output", type=Path, help="Aggregat je Gruppe x Parameter als CSV")
+    parser.add_argument("--rows-output", type=Path, help="Elastizitaeten je Zeile x Szenario x Parameter als CSV")
+    args = parser.parse_args()
+
+    from modernisierung_core import load_axes
+
+    data = load_data()
+    paths = args.paths or numeric_leaves(data)
+    unknown = [p for p in paths if p not in numeric_leaves(data)]
+    if unknown:
+        raise SystemExit(f"Kein numerisches Blatt in data.json: {', '.join(unknown)}")
+    axes = load_axes(args.axes) if args.axes else INPUT_AXES
+    summary, stats = run_sensitivity(data, paths, args.delta / 100, args.outputs, args.group_by, axes,
+                                     args.rank_by, args.chunk_rows, args.rows_output)
+
+    print(f"[INFO] {stats['paths']} Parameter x ±{args.delta:g} %, {stats['matrix_rows']} Matrixzeilen; "
+          f"{stats['evaluated_rows']} Zeilen gerechnet "
+          f"(naiv: {2 * stats['paths'] * stats['matrix_rows']}), davon {stats['reused_energy_rows']} nur Kosten/CO2 "
+          f"auf der Basis-Energiebilanz")
+    if stats["unused_paths"]:
+        print(f"[INFO] Vom Rechenkern nicht gelesen (Elastizitaet 0): {', '.join(stats['unused_paths'])}")
+    print_tornado(summary, args.group_by, args.rank_by, args.top)
+    if args.output:
+        summary.to_csv(args.output, index=False)
+        print(f"\nGeschrieben: {args.output}")
+    if args.rows_output:
+        print(f"Geschrieben: {args.rows_output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+"""
+Aufbau von data/subsidies.json: Bundeslaender, Foerdermassnahmen und Dateipfad.
+
+Nur Standardbibliothek. Gemeinsame Grundlage fuer den Abruf (fetch_subsidies) und die
+Auswertung je Bundesland (regional); letztere laedt damit nicht die Abruf-Pipeline.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SUBSIDY_PATH = ROOT / "data" / "subsidies.json"
+
+BUNDESLAENDER = [
+    "BW", "BY", "BE", "BB", "HB", "HH", "HE", "MV",
+    "NI", "NW", "RP", "SL", "SN", "ST", "SH", "TH",
+]
+
+MEASURES = [
+    "pv",
+    "battery",
+    "heatpump",
+    "heating_optimization",
+    "building_envelope",
+]